@@ -68,7 +68,7 @@ def create_app(config_class=Config):
         from flask import render_template, request
         from flask_login import current_user
         from app.models import Attendance, User
-        from datetime import datetime, date, timedelta
+        from datetime import date, timedelta
         from sqlalchemy import or_
         from app.utils.decorators import role_required
 
@@ -84,7 +84,7 @@ def create_app(config_class=Config):
 
         if filter_date_str:
             try:
-                filter_date = datetime.strptime(filter_date_str, "%Y-%m-%d").date()
+                filter_date = date.fromisoformat(filter_date_str)
             except ValueError:
                 filter_date = date.today()
         else:
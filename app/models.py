@@ -1,8 +1,14 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, DDL
 from app import db
 
+def _utcnow():
+    # Naive UTC timestamp - the DateTime columns store UTC without a zone
+    # (datetime.utcnow() is deprecated since Python 3.12)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     
@@ -38,8 +44,8 @@ class User(UserMixin, db.Model):
     pan_number = db.Column(db.String(20))
     uan_number = db.Column(db.String(20))
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
     
     # Relationships
     attendances = db.relationship('Attendance', backref='user', lazy='dynamic', cascade='all, delete-orphan')
@@ -49,6 +55,27 @@ class User(UserMixin, db.Model):
     approved_leaves = db.relationship('Leave', foreign_keys='Leave.approved_by', backref='approver', lazy='dynamic')
     manager = db.relationship('User', remote_side=[id], backref='subordinates')
     
+    # Trigram GIN indexes so the '%term%' ILIKE searches in the employee list
+    # and directory can use an index instead of a sequential scan (Postgres only)
+    __table_args__ = (
+        db.Index('ix_users_name_lower_trgm', db.func.lower(db.text('name')).label('name_lower'),
+                 postgresql_using='gin',
+                 postgresql_ops={'name_lower': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_users_employee_id_trgm', 'employee_id', postgresql_using='gin',
+                 postgresql_ops={'employee_id': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_users_email_trgm', 'email', postgresql_using='gin',
+                 postgresql_ops={'email': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        # Index-ordered scans for the employee list (newest first) and the
+        # directory (by name); partial because both filter on Employee
+        db.Index('ix_users_role_created_desc', role, created_at.desc(),
+                 postgresql_where=role == 'Employee'),
+        db.Index('ix_users_role_name', role, name,
+                 postgresql_where=role == 'Employee'),
+        # Joining-date ranges for the payroll dashboard headcount chart
+        db.Index('ix_users_role_doj', role, date_of_joining,
+                 postgresql_where=role == 'Employee'),
+    )
+    
     @property
     def has_missing_bank_info(self):
         """Check if employee has missing bank information"""
@@ -68,6 +95,13 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.employee_id}: {self.name}>'
 
+# The trigram indexes above need the pg_trgm extension
+event.listen(
+    User.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
 class Attendance(db.Model):
     __tablename__ = 'attendances'
     
@@ -79,13 +113,17 @@ class Attendance(db.Model):
     status = db.Column(db.String(20), nullable=False, default='Absent')  # Present, Absent, Half Day
     working_hours = db.Column(db.Float, default=0.0)
     extra_hours = db.Column(db.Float, default=0.0)  # Hours worked beyond standard 8 hours
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
     
     # Relationships
     check_logs = db.relationship('AttendanceLog', backref='attendance', lazy='dynamic', cascade='all, delete-orphan', order_by='AttendanceLog.timestamp')
     
-    __table_args__ = (db.UniqueConstraint('user_id', 'date', name='unique_user_date'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'date', name='unique_user_date'),
+        # Covering index for "who is in today" lookups across many users
+        db.Index('ix_attendance_date_user_status', 'date', 'user_id', postgresql_include=['status']),
+    )
     
     def calculate_working_hours(self):
         """Calculate total working hours from all check-in/check-out logs"""
@@ -148,10 +186,17 @@ class AttendanceLog(db.Model):
     __tablename__ = 'attendance_logs'
     
     id = db.Column(db.Integer, primary_key=True)
-    attendance_id = db.Column(db.Integer, db.ForeignKey('attendances.id'), nullable=False, index=True)
+    attendance_id = db.Column(db.Integer, db.ForeignKey('attendances.id'), nullable=False)
     log_type = db.Column(db.String(20), nullable=False)  # check_in, check_out
     timestamp = db.Column(db.Time, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    
+    # "Latest log of this attendance" is read on every page (check-in state),
+    # so index the logs newest-first within their attendance record; this also
+    # serves plain attendance_id lookups
+    __table_args__ = (
+        db.Index('ix_attlog_att_id_desc', 'attendance_id', db.text('id DESC')),
+    )
     
     def __repr__(self):
         return f'<AttendanceLog {self.attendance_id}: {self.log_type} at {self.timestamp}>'
@@ -167,8 +212,17 @@ class Leave(db.Model):
     reason = db.Column(db.Text)
     status = db.Column(db.String(20), nullable=False, default='Pending')  # Pending, Approved, Rejected
     approved_by = db.Column(db.Integer, db.ForeignKey('users.id'))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
+    
+    __table_args__ = (
+        # Per-employee lookups: overlap check on apply, approved days in payroll
+        db.Index('ix_leaves_user_id_status_dates', 'user_id', 'status', 'start_date', 'end_date'),
+        # Company-wide "on leave today"; only approved leaves count, so the
+        # Postgres index is partial on them
+        db.Index('ix_leave_active', 'start_date', 'end_date',
+                 postgresql_where=db.text("status = 'Approved'")),
+    )
     
     def __repr__(self):
         return f'<Leave {self.user_id}: {self.leave_type} - {self.status}>'
@@ -188,8 +242,8 @@ class PayrollSettings(db.Model):
     # We use a property to access wage without storing it in the database
     pf_percentage = db.Column(db.Float, default=12.0)  # Default 12%
     professional_tax_amount = db.Column(db.Numeric(10, 2), default=200.0)  # Default 200
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
     
     # Relationship
     salary_components = db.relationship('SalaryComponent', backref='payroll_settings', lazy='dynamic', cascade='all, delete-orphan', order_by='SalaryComponent.display_order')
@@ -284,8 +338,8 @@ class SalaryComponent(db.Model):
     base_for_percentage = db.Column(db.String(50), default='Wage')  # 'Wage' or 'Basic' - what the percentage is calculated from
     display_order = db.Column(db.Integer, default=0)  # Order in which components are displayed
     is_active = db.Column(db.Boolean, default=True)  # Whether this component is active
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
     
     __table_args__ = (db.UniqueConstraint('payroll_settings_id', 'name', name='unique_settings_component'),)
     
@@ -315,7 +369,7 @@ class Payroll(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     payrun_id = db.Column(db.Integer, db.ForeignKey('payruns.id'), index=True)
     month = db.Column(db.Integer, nullable=False)  # 1-12
-    year = db.Column(db.Integer, nullable=False, index=True)
+    year = db.Column(db.Integer, nullable=False)
     basic_salary = db.Column(db.Numeric(10, 2), nullable=False)
     hra = db.Column(db.Numeric(10, 2), default=0.0)
     conveyance = db.Column(db.Numeric(10, 2), default=0.0)
@@ -327,11 +381,23 @@ class Payroll(db.Model):
     total_deductions = db.Column(db.Numeric(10, 2), default=0.0)
     net_salary = db.Column(db.Numeric(10, 2), nullable=False)
     status = db.Column(db.String(20), nullable=False, default='Unpaid')  # Paid, Unpaid
-    generated_at = db.Column(db.DateTime, default=datetime.utcnow)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    __table_args__ = (db.UniqueConstraint('user_id', 'month', 'year', name='unique_user_month_year'),)
+    generated_at = db.Column(db.DateTime, default=_utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'month', 'year', name='unique_user_month_year'),
+        # An employee's payslips newest-first (my payslips); scanned backwards
+        # for the year DESC, month DESC ordering, so no sort step
+        db.Index('ix_payroll_user_year_month', 'user_id', 'year', 'month'),
+        # Company-wide month/year ranges (dashboard charts, payroll report);
+        # also serves year-only filters, so year has no index of its own.
+        # gross_salary is carried so the cost sums stay index-only in Postgres
+        db.Index('ix_payroll_year_month_user', 'year', 'month', 'user_id',
+                 postgresql_include=['gross_salary']),
+        # Month-count ranges (year * 12 + month) from the payroll report
+        db.Index('ix_payroll_period', year * 12 + month, user_id),
+    )
     
     def __repr__(self):
         return f'<Payroll {self.user_id}: {self.month}/{self.year}>'
@@ -344,7 +410,7 @@ class Payrun(db.Model):
     year = db.Column(db.Integer, nullable=False, index=True)
     payslip_count = db.Column(db.Integer, default=0)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow)
     
     # Relationships
     payrolls = db.relationship('Payroll', backref='payrun', lazy='dynamic')
@@ -363,7 +429,7 @@ class CompanySettings(db.Model):
     setting_value = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     updated_by = db.Column(db.Integer, db.ForeignKey('users.id'))
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
     
     updater = db.relationship('User', foreign_keys=[updated_by])
     
@@ -386,7 +452,6 @@ class CompanySettings(db.Model):
                 setting.description = description
             if user_id:
                 setting.updated_by = user_id
-            setting.updated_at = datetime.utcnow()
         else:
             setting = CompanySettings(
                 setting_key=key,
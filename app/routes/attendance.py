@@ -17,6 +17,8 @@ from app.utils.decorators import (
     employee_or_above_required,
     role_required,
 )
+from app.utils.calculations import month_bounds
+from app.utils.cache import directory_cache
 from datetime import datetime, date, time, timedelta
 from calendar import monthrange
 from sqlalchemy import or_, and_, inspect
@@ -24,6 +26,21 @@ from sqlalchemy.exc import OperationalError, InternalError, ProgrammingError
 
 bp = Blueprint("attendance", __name__)
 
+_MONTH_NAMES = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
 
 @bp.route("/")
 @login_required
@@ -50,19 +67,17 @@ def list():
     if year < 2000 or year > 2100:
         year = today.year
 
-    # Calculate start and end dates for the month
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = date(year, month + 1, 1) - timedelta(days=1)
+    # Calculate start and end dates for the month; queries use the
+    # half-open range [start_date, next_month_start)
+    start_date, next_month_start = month_bounds(month, year)
+    end_date = next_month_start - timedelta(days=1)
 
     # Get attendance records for the month
     attendances = (
         Attendance.query.filter(
             Attendance.user_id == current_user.id,
             Attendance.date >= start_date,
-            Attendance.date <= end_date,
+            Attendance.date < next_month_start,
         )
         .order_by(Attendance.date.desc())
         .all()
@@ -75,7 +90,7 @@ def list():
     leaves = Leave.query.filter(
         Leave.user_id == current_user.id,
         Leave.status == "Approved",
-        Leave.start_date <= end_date,
+        Leave.start_date < next_month_start,
         Leave.end_date >= start_date,
     ).all()
 
@@ -96,41 +111,15 @@ def list():
         current += timedelta(days=1)
 
     # Calculate previous and next month/year
-    if month == 1:
-        prev_month = 12
-        prev_year = year - 1
-    else:
-        prev_month = month - 1
-        prev_year = year
-
-    if month == 12:
-        next_month = 1
-        next_year = year + 1
-    else:
-        next_month = month + 1
-        next_year = year
-
-    month_names = [
-        "January",
-        "February",
-        "March",
-        "April",
-        "May",
-        "June",
-        "July",
-        "August",
-        "September",
-        "October",
-        "November",
-        "December",
-    ]
+    prev_month, prev_year = (12, year - 1) if month == 1 else (month - 1, year)
+    next_month, next_year = (1, year + 1) if month == 12 else (month + 1, year)
 
     return render_template(
         "attendance/employee_list.html",
         attendances=attendances,
         month=month,
         year=year,
-        month_name=month_names[month - 1],
+        month_name=_MONTH_NAMES[month - 1],
         days_present=days_present,
         leave_count=leave_count,
         total_working_days=total_working_days,
@@ -167,7 +156,7 @@ def create():
 
         # Validate date
         try:
-            attendance_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            attendance_date = date.fromisoformat(date_str)
         except ValueError:
             errors.append("Invalid date format")
             attendance_date = date.today()
@@ -227,6 +216,7 @@ def create():
             try:
                 db.session.add(attendance)
                 db.session.commit()
+                directory_cache.clear()
                 flash(
                     f"Attendance record created successfully for {user.name}!",
                     "success",
@@ -274,7 +264,7 @@ def edit(attendance_id):
 
         # Validate date
         try:
-            new_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            new_date = date.fromisoformat(date_str)
         except ValueError:
             errors.append("Invalid date format")
             new_date = attendance.date
@@ -320,10 +310,10 @@ def edit(attendance_id):
         else:
             attendance.working_hours = 0.0
 
-        attendance.updated_at = datetime.utcnow()
 
         try:
             db.session.commit()
+            directory_cache.clear()
             flash("Attendance record updated successfully!", "success")
             return redirect(
                 url_for(
@@ -353,6 +343,7 @@ def delete(attendance_id):
     try:
         db.session.delete(attendance)
         db.session.commit()
+        directory_cache.clear()
         flash(
             f'Attendance record for {user_name} on {attendance_date.strftime("%Y-%m-%d")} deleted successfully!',
             "success",
@@ -405,6 +396,7 @@ def checkin():
             )
             db.session.add(log)
             db.session.commit()
+            directory_cache.clear()
 
             flash(
                 f'Checked in successfully at {current_time.strftime("%I:%M %p")}',
@@ -432,6 +424,7 @@ def checkin():
         )
         db.session.add(log)
         db.session.commit()
+        directory_cache.clear()
 
         flash(
             f'Checked in successfully at {current_time.strftime("%I:%M %p")}', "success"
@@ -469,15 +462,16 @@ def checkout():
             flash("Please check in first before checking out.", "warning")
             return redirect(request.referrer or url_for("dashboard.dashboard"))
 
-        # Get the last log entry
-        last_log = (
+        # Load today's logs once: the last entry decides whether a check-out
+        # is allowed and the full list is reused for the hours calculation
+        all_logs = (
             AttendanceLog.query.filter_by(attendance_id=attendance.id)
-            .order_by(AttendanceLog.id.desc())
-            .first()
+            .order_by(AttendanceLog.id)
+            .all()
         )
 
         # If no logs or last action was check-out, prevent duplicate check-out
-        if not last_log or last_log.log_type == "check_out":
+        if not all_logs or all_logs[-1].log_type == "check_out":
             flash("You need to check in first before checking out.", "warning")
             return redirect(request.referrer or url_for("dashboard.dashboard"))
 
@@ -488,17 +482,12 @@ def checkout():
             timestamp=current_time.time(),
         )
         db.session.add(log)
+        all_logs.append(log)
 
         # Update check-out time in attendance record
         attendance.check_out = current_time.time()
 
         # Calculate total working hours from all check-in/check-out pairs
-        all_logs = (
-            AttendanceLog.query.filter_by(attendance_id=attendance.id)
-            .order_by(AttendanceLog.id)
-            .all()
-        )
-
         total_seconds = 0
         check_in_time = None
 
@@ -517,6 +506,7 @@ def checkout():
         attendance.working_hours = round(total_seconds / 3600, 2)
 
         db.session.commit()
+        directory_cache.clear()
 
         hours = int(attendance.working_hours)
         minutes = int((attendance.working_hours - hours) * 60)
@@ -4,13 +4,31 @@ from app import db
 from app.models import User, PayrollSettings
 from app.utils.validators import validate_email, validate_password
 from app.utils.decorators import admin_required
+from app.utils.cache import roster_cache, dashboard_cache
 from config import Config
+from werkzeug.security import generate_password_hash, check_password_hash
 import requests
-from datetime import datetime
+from datetime import datetime, timezone
+from urllib.parse import urlencode
 from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 
 bp = Blueprint('auth', __name__)
 
+# Hash checked against when the login ID is unknown, so a miss costs the same
+# hashing work as a wrong password and response timing does not reveal which
+# login IDs exist
+_DUMMY_PASSWORD_HASH = generate_password_hash('workzen-dummy-password')
+
+# Request-independent part of the Google OAuth authorization URL
+_GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
+_GOOGLE_AUTH_STATIC_PARAMS = urlencode({
+    'response_type': 'code',
+    'scope': 'openid email profile',
+    'access_type': 'offline',
+    'prompt': 'consent'
+})
+
 @bp.route('/register', methods=['GET', 'POST'])
 def register():
     # Only Admin can register new users (manage user accounts)
@@ -31,7 +49,7 @@ def register():
         if not validate_email(email):
             errors.append('Invalid email address')
         
-        if User.query.filter_by(email=email).first():
+        if db.session.query(db.exists().where(User.email == email)).scalar():
             errors.append('Email already registered')
         
         if not password:
@@ -53,7 +71,7 @@ def register():
         else:
             # Generate employee ID
             employee_id = f"EMP{User.query.count() + 1:04d}"
-            while User.query.filter_by(employee_id=employee_id).first():
+            while db.session.query(db.exists().where(User.employee_id == employee_id)).scalar():
                 employee_id = f"EMP{User.query.count() + 1:04d}"
             
             user = User(
@@ -66,7 +84,15 @@ def register():
             user.set_password(password)
             
             db.session.add(user)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another request took the email or employee ID since the checks above
+                db.session.rollback()
+                flash('Could not register the user, please try again', 'danger')
+                return render_template('auth/register.html')
+            roster_cache.clear()
+            dashboard_cache.clear()
             
             flash('User registered successfully!', 'success')
             return redirect(url_for('employees.list'))
@@ -94,7 +120,13 @@ def login():
             )
         ).first()
         
-        if user and user.check_password(password):
+        if user:
+            password_ok = user.check_password(password)
+        else:
+            check_password_hash(_DUMMY_PASSWORD_HASH, password)
+            password_ok = False
+        
+        if password_ok:
             login_user(user)
             next_page = request.args.get('next')
             if not next_page or not next_page.startswith('/'):
@@ -130,15 +162,8 @@ def google_login():
     redirect_uri = request.url_root.rstrip('/') + url_for('auth.google_callback')
     
     # Build Google OAuth URL
-    google_auth_url = (
-        f"https://accounts.google.com/o/oauth2/v2/auth?"
-        f"client_id={client_id}&"
-        f"redirect_uri={redirect_uri}&"
-        f"response_type=code&"
-        f"scope=openid email profile&"
-        f"access_type=offline&"
-        f"prompt=consent"
-    )
+    request_params = urlencode({'client_id': client_id, 'redirect_uri': redirect_uri})
+    google_auth_url = f"{_GOOGLE_AUTH_URL}?{request_params}&{_GOOGLE_AUTH_STATIC_PARAMS}"
     
     return redirect(google_auth_url)
 
@@ -202,7 +227,7 @@ def google_callback():
             # Create new user with Google sign-in
             # Default role is Employee for Google sign-ups
             employee_id = f"EMP{User.query.count() + 1:04d}"
-            while User.query.filter_by(employee_id=employee_id).first():
+            while db.session.query(db.exists().where(User.employee_id == employee_id)).scalar():
                 employee_id = f"EMP{User.query.count() + 1:04d}"
             
             user = User(
@@ -210,15 +235,13 @@ def google_callback():
                 name=name or email.split('@')[0],
                 email=email,
                 role='Employee',
-                date_of_joining=datetime.utcnow().date(),
+                date_of_joining=datetime.now(timezone.utc).date(),
                 password_hash='google_oauth'  # Special marker for OAuth users
             )
-            db.session.add(user)
-            db.session.flush()
             
-            # Create payroll settings
-            payroll_settings = PayrollSettings(
-                user_id=user.id,
+            # Create payroll settings - attached through the relationship so
+            # both rows are written in the single commit
+            user.payroll_settings = PayrollSettings(
                 basic_salary=0.0,
                 hra_percentage=0.0,
                 conveyance=0.0,
@@ -226,8 +249,10 @@ def google_callback():
                 pf_percentage=12.0,
                 professional_tax_amount=200.0
             )
-            db.session.add(payroll_settings)
+            db.session.add(user)
             db.session.commit()
+            roster_cache.clear()
+            dashboard_cache.clear()
             
             flash('Account created successfully with Google!', 'success')
         
@@ -1,9 +1,11 @@
 from flask import Blueprint, render_template, redirect, url_for
 from flask_login import login_required, current_user
+from app import db
 from app.models import User, Attendance, Leave, Payroll
 from app.utils.decorators import employee_or_above_required
 from datetime import datetime, date, timedelta
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 bp = Blueprint('dashboard', __name__)
 
@@ -50,8 +52,10 @@ def admin_dashboard():
     # Recent employees
     recent_employees = User.query.order_by(User.created_at.desc()).limit(5).all()
     
-    # Recent attendance
-    recent_attendance = Attendance.query.order_by(Attendance.date.desc()).limit(10).all()
+    # Recent attendance (user joined in the same query for the name column)
+    recent_attendance = Attendance.query.options(
+        joinedload(Attendance.user).load_only(User.name, User.employee_id)
+    ).order_by(Attendance.date.desc()).limit(10).all()
     
     return render_template('dashboard/admin_dashboard.html',
                          total_employees=total_employees,
@@ -73,17 +77,17 @@ def employee_dashboard():
         date=today
     ).first()
     
-    # My attendance summary (this month)
-    month_start = date.today().replace(day=1)
-    month_attendance = Attendance.query.filter(
+    # My attendance summary (this month), counted per status in SQL
+    month_start = today.replace(day=1)
+    status_counts = dict(db.session.query(Attendance.status, func.count()).filter(
         Attendance.user_id == user.id,
         Attendance.date >= month_start,
         Attendance.date <= today
-    ).all()
+    ).group_by(Attendance.status).all())
     
-    present_count = sum(1 for a in month_attendance if a.status == 'Present')
-    absent_count = sum(1 for a in month_attendance if a.status == 'Absent')
-    half_day_count = sum(1 for a in month_attendance if a.status == 'Half Day')
+    present_count = status_counts.get('Present', 0)
+    absent_count = status_counts.get('Absent', 0)
+    half_day_count = status_counts.get('Half Day', 0)
     
     # My leaves
     my_leaves = Leave.query.filter_by(user_id=user.id).order_by(Leave.created_at.desc()).limit(5).all()
@@ -117,7 +121,9 @@ def hr_dashboard():
     recent_employees = User.query.filter(User.role == 'Employee').order_by(User.created_at.desc()).limit(5).all()
     
     # Recent leave requests
-    recent_leaves = Leave.query.order_by(Leave.created_at.desc()).limit(5).all()
+    recent_leaves = Leave.query.options(
+        joinedload(Leave.user).load_only(User.name, User.employee_id)
+    ).order_by(Leave.created_at.desc()).limit(5).all()
     
     return render_template('dashboard/hr_dashboard.html',
                          total_employees=total_employees,
@@ -131,8 +137,9 @@ def payroll_dashboard():
     total_employees = User.query.filter(User.role == 'Employee').count()
     
     # This month's payroll
-    current_month = date.today().month
-    current_year = date.today().year
+    today = date.today()
+    current_month = today.month
+    current_year = today.year
     payroll_this_month = Payroll.query.filter(
         Payroll.month == current_month,
         Payroll.year == current_year
@@ -142,10 +149,14 @@ def payroll_dashboard():
     pending_leaves = Leave.query.filter(Leave.status == 'Pending').count()
     
     # Recent payrolls
-    recent_payrolls = Payroll.query.order_by(Payroll.year.desc(), Payroll.month.desc()).limit(10).all()
+    recent_payrolls = Payroll.query.options(
+        joinedload(Payroll.user).load_only(User.name, User.employee_id)
+    ).order_by(Payroll.year.desc(), Payroll.month.desc()).limit(10).all()
     
     # Recent leave requests
-    recent_leaves = Leave.query.order_by(Leave.created_at.desc()).limit(5).all()
+    recent_leaves = Leave.query.options(
+        joinedload(Leave.user).load_only(User.name, User.employee_id)
+    ).order_by(Leave.created_at.desc()).limit(5).all()
     
     return render_template('dashboard/payroll_dashboard.html',
                          total_employees=total_employees,
@@ -1,16 +1,105 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, abort
+from flask import Blueprint, render_template, stream_template, request, flash, get_flashed_messages, redirect, url_for, jsonify, abort
 from flask_login import login_required, current_user
 from app import db
-from app.models import User, PayrollSettings
+from app.models import User, PayrollSettings, Attendance, AttendanceLog, Leave, CompanySettings
 from app.utils.decorators import admin_required, hr_required, employee_or_above_required, role_required
 from app.utils.validators import validate_email, validate_phone, validate_password, validate_employee_id
 from app.utils.employee_utils import generate_login_id, generate_random_password
-from datetime import datetime
-from sqlalchemy import or_
-from sqlalchemy.exc import OperationalError, InternalError, ProgrammingError
+from app.utils.cache import directory_cache, roster_cache, dashboard_cache
+from datetime import date
+from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import load_only
+from sqlalchemy.exc import OperationalError, InternalError, ProgrammingError, IntegrityError
 
 bp = Blueprint('employees', __name__)
 
+# Roles an Admin/HR Officer can register, and every assignable role
+_STAFF_ROLES = frozenset({'Employee', 'HR Officer', 'Payroll Officer'})
+_ALL_ROLES = _STAFF_ROLES | {'Admin'}
+
+# Rows per page in the employee list and directory
+_PER_PAGE = 50
+
+# Columns rendered by the employee list and directory tables
+_LISTING_COLUMNS = (User.id, User.name, User.employee_id, User.email, User.role,
+                    User.date_of_joining, User.contact_number)
+
+def _search_filter(search):
+    """Every word of the search must appear somewhere in the name ("John D"
+    finds "John Doe"); login IDs and emails match any part of the value, so
+    a fragment of an ID or a mail domain ("@gmail") still finds people"""
+    # autoescape makes % and _ in the search match literally instead of as
+    # wildcards (a bare "%" would otherwise match - and scan - every row)
+    name_lower = func.lower(User.name)
+    return or_(
+        and_(*[name_lower.contains(token, autoescape=True) for token in search.lower().split()]),
+        User.employee_id.icontains(search, autoescape=True),
+        User.email.icontains(search, autoescape=True)
+    )
+
+def _employees_json(employees, pagination, employee_statuses=None):
+    """Rows only (no page layout) for live-search requests with ?format=json"""
+    rows = []
+    for employee in employees:
+        row = {
+            'id': employee.id,
+            'employee_id': employee.employee_id,
+            'name': employee.name,
+            'email': employee.email,
+            'role': employee.role,
+            'date_of_joining': employee.date_of_joining.strftime('%Y-%m-%d'),
+            'contact_number': employee.contact_number
+        }
+        if employee_statuses is not None:
+            row['status'] = employee_statuses.get(employee.id, 'absent')
+        rows.append(row)
+    return jsonify({'employees': rows, 'page': pagination.page, 'pages': pagination.pages})
+
+def _today_statuses(today):
+    """
+    Snapshot of who is on leave / checked in today, shared by every directory
+    request until it expires or an attendance write or leave approval clears it.
+    Employees missing from the dict are absent (red dot).
+    """
+    statuses = directory_cache.get(('statuses', today))
+    if statuses is not None:
+        return statuses
+    
+    # On approved leave today (airplane icon)
+    on_leave = db.select(Leave.user_id, db.literal('on_leave').label('status')).where(
+        Leave.start_date <= today,
+        Leave.end_date >= today,
+        Leave.status == 'Approved'
+    )
+    
+    # Latest log of each of today's attendance records - if it is a check_in
+    # the employee is currently checked in (green dot)
+    last_log_ids = db.select(func.max(AttendanceLog.id).label('id')).join(
+        Attendance, Attendance.id == AttendanceLog.attendance_id
+    ).where(Attendance.date == today).group_by(AttendanceLog.attendance_id).subquery()
+    
+    checked_in = db.select(Attendance.user_id, db.literal('present').label('status')).join(
+        AttendanceLog, AttendanceLog.attendance_id == Attendance.id
+    ).join(last_log_ids, last_log_ids.c.id == AttendanceLog.id).where(
+        AttendanceLog.log_type == 'check_in'
+    )
+    
+    # Run inside a savepoint so a failing query only unwinds itself and the
+    # rest of the request's transaction stays usable; everyone then shows as
+    # absent and nothing is cached, so the next request retries
+    try:
+        with db.session.begin_nested():
+            rows = db.session.execute(db.union_all(on_leave, checked_in)).all()
+    except (OperationalError, InternalError, ProgrammingError):
+        return {}
+    
+    # Leave takes priority over a check-in, so its rows are applied last
+    statuses = {user_id: status for user_id, status in rows if status == 'present'}
+    statuses.update((user_id, status) for user_id, status in rows if status == 'on_leave')
+    
+    directory_cache.set(('statuses', today), statuses)
+    return statuses
+
 @bp.route('/')
 @login_required
 @role_required(['Admin', 'HR Officer'])
@@ -18,19 +107,16 @@ def list():
     # Only Admin and HR Officer can see full list with actions
     # This is for employee management (create, edit, delete operations)
     search = request.args.get('search', '').strip()
-    query = User.query.filter(User.role == 'Employee')
+    page = request.args.get('page', 1, type=int)
+    query = User.query.options(load_only(*_LISTING_COLUMNS)).filter(User.role == 'Employee')
     
     if search:
-        query = query.filter(
-            or_(
-                User.name.ilike(f'%{search}%'),
-                User.employee_id.ilike(f'%{search}%'),
-                User.email.ilike(f'%{search}%')
-            )
-        )
+        query = query.filter(_search_filter(search))
     
-    employees = query.order_by(User.created_at.desc()).all()
-    return render_template('employees/list.html', employees=employees, search=search)
+    pagination = query.order_by(User.created_at.desc()).paginate(page=page, per_page=_PER_PAGE, error_out=False)
+    if request.args.get('format') == 'json':
+        return _employees_json(pagination.items, pagination)
+    return render_template('employees/list.html', employees=pagination.items, pagination=pagination, search=search)
 
 @bp.route('/directory')
 @login_required
@@ -40,16 +126,14 @@ def directory():
     # Employees have read-only access (cannot edit or delete)
     # Admin, HR Officer, Payroll Officer have full access
     
-    from app.models import Attendance, Leave
-    from datetime import date, datetime
-    
     search = request.args.get('search', '').strip()
     filter_type = request.args.get('filter', '').strip()
+    page = request.args.get('page', 1, type=int)
     
     # Admin can see all users (Employee, HR Officer, Payroll Officer)
     # Others can only see Employees
     if current_user.role == 'Admin':
-        query = User.query.filter(User.role.in_(['Employee', 'HR Officer', 'Payroll Officer']))
+        query = User.query.filter(User.role.in_(_STAFF_ROLES))
     else:
         query = User.query.filter(User.role == 'Employee')
     
@@ -66,80 +150,28 @@ def directory():
         query = query.filter(User.manager_id == None)
     
     if search:
-        query = query.filter(
-            or_(
-                User.name.ilike(f'%{search}%'),
-                User.employee_id.ilike(f'%{search}%'),
-                User.email.ilike(f'%{search}%')
-            )
-        )
+        query = query.filter(_search_filter(search))
     
-    employees = query.order_by(User.name).all()
+    query = query.options(load_only(*_LISTING_COLUMNS)).order_by(User.name)
     
     # Get today's date
     today = date.today()
     
-    # Get employee statuses based on live attendance data
-    employee_statuses = {}
-    for employee in employees:
-        try:
-            # Check if on leave today (leave takes priority)
-            today_leave = Leave.query.filter(
-                Leave.user_id == employee.id,
-                Leave.start_date <= today,
-                Leave.end_date >= today,
-                Leave.status == 'Approved'
-            ).first()
-            
-            if today_leave:
-                employee_statuses[employee.id] = 'on_leave'  # Airplane icon
-            else:
-                # Check today's attendance - use live check-in/checkout status based on logs
-                try:
-                    from app.models import AttendanceLog
-                    
-                    today_attendance = Attendance.query.filter_by(
-                        user_id=employee.id,
-                        date=today
-                    ).first()
-                    
-                    if today_attendance:
-                        # Check the last log to determine current status
-                        last_log = AttendanceLog.query.filter_by(
-                            attendance_id=today_attendance.id
-                        ).order_by(AttendanceLog.id.desc()).first()
-                        
-                        # If last log is check_in, employee is currently checked in (green)
-                        # If last log is check_out or no logs, employee is not checked in (red)
-                        if last_log and last_log.log_type == 'check_in':
-                            employee_statuses[employee.id] = 'present'  # Green dot - checked in
-                        else:
-                            employee_statuses[employee.id] = 'absent'  # Red dot - checked out or not checked in
-                    else:
-                        employee_statuses[employee.id] = 'absent'  # Red dot - no attendance record
-                except (OperationalError, InternalError, ProgrammingError) as e:
-                    # Transaction error - rollback and set default status
-                    try:
-                        db.session.rollback()
-                    except:
-                        pass
-                    employee_statuses[employee.id] = 'absent'  # Default to absent on error
-                except Exception:
-                    # Any other error - set default status
-                    employee_statuses[employee.id] = 'absent'
-        except (OperationalError, InternalError, ProgrammingError) as e:
-            # Transaction error - rollback and set default status
-            try:
-                db.session.rollback()
-            except:
-                pass
-            employee_statuses[employee.id] = 'absent'  # Default to absent on error
-        except Exception:
-            # Any other error - set default status
-            employee_statuses[employee.id] = 'absent'
+    pagination = query.paginate(page=page, per_page=_PER_PAGE, error_out=False)
+    employees = pagination.items
+    
+    employee_statuses = _today_statuses(today)
     
-    return render_template('employees/directory.html', 
+    if request.args.get('format') == 'json':
+        return _employees_json(employees, pagination, employee_statuses)
+    
+    # Streamed so the layout reaches the browser while the cards render.
+    # Flashes are popped first: the session cookie is already sent once the
+    # body starts streaming, so popping them in the template would not stick
+    get_flashed_messages()
+    return stream_template('employees/directory.html', 
                          employees=employees, 
+                         pagination=pagination,
                          search=search,
                          employee_statuses=employee_statuses)
 
@@ -174,10 +206,10 @@ def register():
         
         if not validate_email(email):
             errors.append('Invalid email address')
-        elif User.query.filter_by(email=email).first():
+        elif db.session.query(db.exists().where(User.email == email)).scalar():
             errors.append('Email already registered')
         
-        if role not in ['Employee', 'HR Officer', 'Payroll Officer']:
+        if role not in _STAFF_ROLES:
             errors.append('Invalid role')
         
         if not date_of_joining:
@@ -192,7 +224,7 @@ def register():
         else:
             # Parse date of joining
             try:
-                joining_date = datetime.strptime(date_of_joining, '%Y-%m-%d').date()
+                joining_date = date.fromisoformat(date_of_joining)
             except ValueError:
                 flash('Invalid date format', 'danger')
                 return render_template('employees/register.html')
@@ -204,7 +236,6 @@ def register():
             password = generate_random_password(12)
             
             # Get company name from settings
-            from app.models import CompanySettings
             company_name = CompanySettings.get_setting('company_name', 'WorkZen')
             
             # Auto-assign manager as the current user (Admin/HR Officer who is creating the employee)
@@ -223,12 +254,9 @@ def register():
             )
             user.set_password(password)
             
-            db.session.add(user)
-            db.session.flush()  # Flush to get user.id
-            
-            # Create payroll settings with default values
-            payroll_settings = PayrollSettings(
-                user_id=user.id,
+            # Create payroll settings with default values - attached through
+            # the relationship so both rows are written in the single commit
+            user.payroll_settings = PayrollSettings(
                 basic_salary=0.0,
                 hra_percentage=0.0,
                 conveyance=0.0,
@@ -236,8 +264,16 @@ def register():
                 pf_percentage=12.0,
                 professional_tax_amount=200.0
             )
-            db.session.add(payroll_settings)
-            db.session.commit()
+            db.session.add(user)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another request took the email or login ID since the checks above
+                db.session.rollback()
+                flash('Could not register the employee, please try again', 'danger')
+                return render_template('employees/register.html')
+            roster_cache.clear()
+            dashboard_cache.clear()
             
             flash(f'Employee {name} registered successfully! Login ID: {employee_id}, Password: {password}. Please share these credentials with the employee.', 'credentials')
             return redirect(url_for('employees.directory'))
@@ -248,10 +284,12 @@ def register():
 @login_required
 @role_required(['Admin', 'HR Officer'])
 def edit(user_id):
+    # Resolve the current_user proxy once for the checks below
+    viewer = current_user._get_current_object()
     user = User.query.get_or_404(user_id)
     
     # HR Officers can only edit employees (not other HR Officers, Payroll Officers, or Admins)
-    if current_user.role == 'HR Officer' and user.role != 'Employee':
+    if viewer.role == 'HR Officer' and user.role != 'Employee':
         abort(403)
     
     if request.method == 'POST':
@@ -270,15 +308,13 @@ def edit(user_id):
         
         if not validate_email(email):
             errors.append('Invalid email address')
-        elif email != user.email and User.query.filter_by(email=email).first():
-            errors.append('Email already registered')
         
         # Role validation
-        if current_user.role == 'Admin':
+        if viewer.role == 'Admin':
             # Admin can change role to anything except Admin (to prevent accidental admin removal)
             if user.role == 'Admin' and role != 'Admin':
                 errors.append('Cannot change role of Admin user. This is a security measure.')
-            elif role not in ['Employee', 'HR Officer', 'Payroll Officer', 'Admin']:
+            elif role not in _ALL_ROLES:
                 errors.append('Invalid role')
         else:
             # HR Officer can only keep role as Employee
@@ -291,6 +327,10 @@ def edit(user_id):
         if contact_number and not validate_phone(contact_number):
             errors.append('Invalid contact number (10 digits required)')
         
+        # Uniqueness needs a DB round-trip, so only check it once the form is otherwise valid
+        if not errors and email != user.email and db.session.query(db.exists().where(User.email == email)).scalar():
+            errors.append('Email already registered')
+        
         if errors:
             for error in errors:
                 flash(error, 'danger')
@@ -300,12 +340,13 @@ def edit(user_id):
             # Only update role if user is not Admin or if keeping Admin role
             if user.role != 'Admin':
                 user.role = role
-            user.date_of_joining = datetime.strptime(date_of_joining, '%Y-%m-%d').date()
+            user.date_of_joining = date.fromisoformat(date_of_joining)
             user.contact_number = contact_number if contact_number else None
             user.address = address if address else None
-            user.updated_at = datetime.utcnow()
             
             db.session.commit()
+            roster_cache.clear()
+            dashboard_cache.clear()
             flash(f'User {name} updated successfully!', 'success')
             return redirect(url_for('employees.directory'))
     
@@ -324,6 +365,8 @@ def delete(user_id):
     name = user.name
     db.session.delete(user)
     db.session.commit()
+    roster_cache.clear()
+    dashboard_cache.clear()
     
     flash(f'Employee {name} deleted successfully!', 'success')
     return redirect(url_for('employees.directory'))
@@ -332,26 +375,29 @@ def delete(user_id):
 @login_required
 @employee_or_above_required
 def view(user_id):
-    user = User.query.get_or_404(user_id)
+    # Resolve the current_user proxy once for the checks below
+    viewer = current_user._get_current_object()
     
-    # Permission checks:
+    # Permission checks (before loading anyone else's profile):
     # - Employees can only view their own profile
     # - Admin, HR Officer, Payroll Officer can view any employee
-    if current_user.role == 'Employee' and current_user.id != user_id:
+    if viewer.role == 'Employee' and viewer.id != user_id:
         abort(403)
     
+    user = User.query.get_or_404(user_id)
+    
     # Determine if profile should be editable
     can_edit = False
     can_edit_salary = False
     
-    if current_user.role == 'Admin':
+    if viewer.role == 'Admin':
         can_edit = True
         can_edit_salary = True
-    elif current_user.role == 'HR Officer':
+    elif viewer.role == 'HR Officer':
         # HR can edit employee profiles only
         can_edit = (user.role == 'Employee')
         can_edit_salary = False  # HR cannot edit salary
-    elif current_user.role == 'Payroll Officer':
+    elif viewer.role == 'Payroll Officer':
         can_edit = False  # Payroll cannot edit profiles
         can_edit_salary = (user.role == 'Employee')  # But can edit salary components for employees only
     
@@ -359,5 +405,5 @@ def view(user_id):
                          user=user, 
                          can_edit=can_edit,
                          can_edit_salary=can_edit_salary,
-                         is_own_profile=(current_user.id == user_id))
+                         is_own_profile=(viewer.id == user_id))
 
@@ -4,11 +4,16 @@ from app import db
 from app.models import Leave, User
 from app.utils.decorators import admin_required, hr_required, payroll_required, employee_or_above_required, role_required
 from app.utils.validators import validate_date_range
-from datetime import datetime, date
-from sqlalchemy import or_, and_
+from app.utils.cache import directory_cache
+from datetime import date
+from sqlalchemy import or_, func, case, select, lambda_stmt
+from sqlalchemy.orm import contains_eager
 
 bp = Blueprint('leave', __name__)
 
+# Leave requests per page in the list
+_PER_PAGE = 50
+
 @bp.route('/')
 @login_required
 @employee_or_above_required
@@ -21,24 +26,44 @@ def list():
     status_filter = request.args.get('status', '')
     
     if current_user.role == 'Employee':
-        # Employees can only view their own leaves
+        # Employees can only view their own leaves (leave.user resolves to
+        # current_user from the identity map, no extra query)
         query = Leave.query.filter_by(user_id=current_user.id)
+        card_options = ()
     else:
-        # HR Officer, Payroll Officer, Admin can view all leaves
-        query = Leave.query
+        # HR Officer, Payroll Officer, Admin can view all leaves; the cards
+        # show the employee name, populated from the same join
+        query = Leave.query.join(User, Leave.user_id == User.id)
+        card_options = (contains_eager(Leave.user).load_only(User.name, User.employee_id),)
         if search:
-            query = query.join(User).filter(
+            # lower(name) matches the trigram expression index on users
+            query = query.filter(
                 or_(
-                    User.name.ilike(f'%{search}%'),
-                    User.employee_id.ilike(f'%{search}%')
+                    func.lower(User.name).contains(search.lower(), autoescape=True),
+                    User.employee_id.icontains(search, autoescape=True)
                 )
             )
         if status_filter:
-            query = query.filter_by(status=status_filter)
-    
-    leaves = query.order_by(Leave.created_at.desc()).all()
-    
-    return render_template('leave/list.html', leaves=leaves, search=search, status_filter=status_filter)
+            query = query.filter(Leave.status == status_filter)
+    
+    # Stat cards cover every matching request, not just the current page:
+    # per-type totals and pending counts in one grouped query
+    type_counts = {}
+    pending_count = 0
+    for leave_type, total, pending in query.with_entities(
+        Leave.leave_type,
+        func.count(Leave.id),
+        func.sum(case((Leave.status == 'Pending', 1), else_=0))
+    ).group_by(Leave.leave_type):
+        type_counts[leave_type] = total
+        pending_count += pending or 0
+    
+    page = request.args.get('page', 1, type=int)
+    pagination = query.options(*card_options).order_by(Leave.created_at.desc()).paginate(page=page, per_page=_PER_PAGE, error_out=False)
+    
+    return render_template('leave/list.html', leaves=pagination.items, pagination=pagination,
+                         type_counts=type_counts, pending_count=pending_count,
+                         search=search, status_filter=status_filter)
 
 @bp.route('/apply', methods=['GET', 'POST'])
 @login_required
@@ -61,8 +86,8 @@ def apply():
             errors.append('Start date and end date are required')
         else:
             try:
-                start = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end = datetime.strptime(end_date, '%Y-%m-%d').date()
+                start = date.fromisoformat(start_date)
+                end = date.fromisoformat(end_date)
                 
                 if end < start:
                     errors.append('End date must be on or after start date')
@@ -71,16 +96,20 @@ def apply():
                 if not is_valid:
                     errors.append(message)
                 
-                # Check for overlapping leaves
-                overlapping_leaves = Leave.query.filter(
-                    Leave.user_id == current_user.id,
+                # Check for overlapping leaves (two ranges overlap when each
+                # starts on or before the other ends). Built as a lambda
+                # statement so the constructed SQL is cached across requests
+                # and only user_id/start/end are re-bound. Only the columns
+                # shown in the error message are fetched - no Leave objects
+                user_id = current_user.id
+                overlapping_leaves = db.session.execute(lambda_stmt(lambda: select(
+                    Leave.leave_type, Leave.start_date, Leave.end_date, Leave.status
+                ).where(
+                    Leave.user_id == user_id,
                     Leave.status.in_(['Pending', 'Approved']),
-                    or_(
-                        and_(Leave.start_date <= start, Leave.end_date >= start),
-                        and_(Leave.start_date <= end, Leave.end_date >= end),
-                        and_(Leave.start_date >= start, Leave.end_date <= end)
-                    )
-                ).all()
+                    Leave.start_date <= end,
+                    Leave.end_date >= start
+                ))).all()
                 
                 if overlapping_leaves:
                     overlap_details = ', '.join([
@@ -124,9 +153,9 @@ def approve(leave_id):
     
     leave.status = 'Approved'
     leave.approved_by = current_user.id
-    leave.updated_at = datetime.utcnow()
     
     db.session.commit()
+    directory_cache.clear()
     flash('Leave request approved successfully!', 'success')
     return redirect(url_for('leave.list'))
 
@@ -143,7 +172,6 @@ def reject(leave_id):
     
     leave.status = 'Rejected'
     leave.approved_by = current_user.id
-    leave.updated_at = datetime.utcnow()
     
     db.session.commit()
     flash('Leave request rejected', 'info')
@@ -1,80 +1,240 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, abort
+from flask import Blueprint, render_template, request, flash, get_flashed_messages, redirect, url_for, abort, make_response, current_app
 from flask_login import login_required, current_user
 from app import db
 from app.models import Payroll, PayrollSettings, SalaryComponent, User
 from app.utils.decorators import admin_required, payroll_required, employee_or_above_required, role_required
 from app.utils.calculations import calculate_monthly_salary
-from datetime import datetime, date
+from app.utils.cache import dashboard_cache
+from app.utils.employee_utils import get_employee_roster
+from datetime import datetime, date, timezone
+import hashlib
+import math
+from types import SimpleNamespace
+from sqlalchemy import insert, update, func, case, extract
+from sqlalchemy.orm import joinedload, load_only
 from sqlalchemy.exc import OperationalError, InternalError, ProgrammingError
+from werkzeug.http import is_resource_modified
 
 bp = Blueprint('payroll', __name__)
 
+# Payslips per page in My Payslips
+_PER_PAGE = 50
+
+# Editable payslip amounts: earnings add up to the gross salary, deductions
+# to the total deductions
+_EARNING_FIELDS = ('basic_salary', 'hra', 'conveyance', 'other_allowances')
+_DEDUCTION_FIELDS = ('pf_contribution', 'professional_tax', 'other_deductions')
+
+# Form labels, for the errors about unreadable amounts
+_FIELD_LABELS = {
+    'basic_salary': 'Basic Salary',
+    'hra': 'HRA',
+    'conveyance': 'Conveyance',
+    'other_allowances': 'Other Allowances',
+    'pf_contribution': 'PF Contribution',
+    'professional_tax': 'Professional Tax',
+    'other_deductions': 'Other Deductions',
+    'wage': 'Wage',
+    'pf_percentage': 'PF percentage',
+    'professional_tax_amount': 'Professional tax',
+}
+
+# Default salary structure for a new employee, in display order
+_DEFAULT_COMPONENTS = (
+    {'name': 'Basic', 'computation_type': 'Percentage', 'value': 50.0, 'base_for_percentage': 'Wage', 'display_order': 1},
+    {'name': 'House Rent Allowance', 'computation_type': 'Percentage', 'value': 50.0, 'base_for_percentage': 'Basic', 'display_order': 2},
+    {'name': 'Standard Allowance', 'computation_type': 'Fixed', 'value': 4167.0, 'base_for_percentage': 'Wage', 'display_order': 3},
+    {'name': 'Performance Bonus', 'computation_type': 'Percentage', 'value': 8.33, 'base_for_percentage': 'Wage', 'display_order': 4},
+    {'name': 'Leave Travel Allowance', 'computation_type': 'Percentage', 'value': 8.333, 'base_for_percentage': 'Wage', 'display_order': 5},
+    {'name': 'Fixed Allowance', 'computation_type': 'Fixed', 'value': 0.0, 'base_for_percentage': 'Wage', 'display_order': 6},  # Will be calculated as remaining
+)
+
+# The same defaults as template-ready objects, shown when an employee has no
+# components yet
+_DEFAULT_COMPONENT_OBJECTS = tuple(SimpleNamespace(**comp_def) for comp_def in _DEFAULT_COMPONENTS)
+
+def _settings_by_user(employees):
+    """PayrollSettings of the given employees in one query, keyed by user_id
+    (employees without settings are missing from the dict)"""
+    ids = [emp.id for emp in employees]
+    if not ids:
+        return {}
+    return {s.user_id: s for s in PayrollSettings.query.filter(PayrollSettings.user_id.in_(ids))}
+
+def _dashboard_charts(current_year):
+    """Headcount and employer cost series for the payroll dashboard. Cached
+    (shared across requests) until payslips or employees change"""
+    charts = dashboard_cache.get(('charts', current_year))
+    if charts is not None:
+        return charts
+    
+    # Employee count by month (current year): employees who joined by the end
+    # of each month. Joiners are counted per (year, month) and accumulated in
+    # SQL with a window sum, so each row carries the headcount up to that
+    # month. The range is on the raw column so the (role, date_of_joining)
+    # index applies
+    joiners = db.select(
+        extract('year', User.date_of_joining).label('year'),
+        extract('month', User.date_of_joining).label('month'),
+        func.count(User.id).label('joined')
+    ).where(
+        User.role == 'Employee',
+        User.date_of_joining < date(current_year + 1, 1, 1)
+    ).group_by('year', 'month').subquery()
+    
+    headcount_before = 0
+    headcount_by_month = {}
+    for year, month, headcount in db.session.execute(db.select(
+        joiners.c.year, joiners.c.month,
+        func.sum(joiners.c.joined).over(order_by=(joiners.c.year, joiners.c.month))
+    ).order_by(joiners.c.year, joiners.c.month)):
+        if int(year) < current_year:
+            # Everyone from earlier years counts from January
+            headcount_before = headcount
+        else:
+            headcount_by_month[int(month)] = headcount
+    
+    # Months without joiners keep the previous month's headcount
+    employee_count_monthly = []
+    headcount = headcount_before
+    for month in range(1, 13):
+        headcount = headcount_by_month.get(month, headcount)
+        employee_count_monthly.append({'month': month, 'count': int(headcount)})
+    
+    # Employer cost by month (current year), one grouped query
+    cost_by_month = dict(db.session.query(Payroll.month, func.sum(Payroll.gross_salary)).filter(
+        Payroll.year == current_year
+    ).group_by(Payroll.month).all())
+    employer_cost_monthly = [
+        {'month': month, 'cost': float(cost_by_month.get(month) or 0)}
+        for month in range(1, 13)
+    ]
+    
+    # Employer cost by year (last 5 years), one grouped query
+    cost_by_year = dict(db.session.query(Payroll.year, func.sum(Payroll.gross_salary)).filter(
+        Payroll.year.between(current_year - 4, current_year)
+    ).group_by(Payroll.year).all())
+    employer_cost_annual = [
+        {'year': year, 'cost': float(cost_by_year.get(year) or 0)}
+        for year in range(current_year - 4, current_year + 1)
+    ]
+    
+    charts = {
+        'employee_count_monthly': employee_count_monthly,
+        'employer_cost_monthly': employer_cost_monthly,
+        'employer_cost_annual': employer_cost_annual
+    }
+    dashboard_cache.set(('charts', current_year), charts)
+    return charts
+
 @bp.route('/')
 @login_required
 @role_required(['Admin', 'Payroll Officer'])
 def list():
     """Payroll Dashboard with warnings and payrun history"""
     from app.models import Payrun
-    from sqlalchemy import func, extract
     
-    # Get warnings
-    employees_without_bank = User.query.filter(
-        User.role == 'Employee',
-        db.or_(
+    # Get warnings - both counts from one scan of the employees
+    employees_without_bank, employees_without_manager = db.session.query(
+        func.count(User.id).filter(db.or_(
             User.bank_account_number == None,
             User.bank_name == None,
             User.ifsc_code == None
-        )
-    ).count()
-    
-    employees_without_manager = User.query.filter(
-        User.role == 'Employee',
-        User.manager_id == None
-    ).count()
+        )),
+        func.count(User.id).filter(User.manager_id == None)
+    ).filter(User.role == 'Employee').one()
     
     # Get payrun history
-    payruns = Payrun.query.order_by(Payrun.year.desc(), Payrun.month.desc()).limit(12).all()
+    payruns = Payrun.query.options(joinedload(Payrun.creator)).order_by(
+        Payrun.year.desc(), Payrun.month.desc()
+    ).limit(12).all()
+    
+    # Payslips of those payruns with their employee in one query, instead of
+    # a payrun.payrolls query per payrun and a user load per payslip
+    payrun_payrolls = {}
+    if payruns:
+        payslips = Payroll.query.options(
+            load_only(Payroll.payrun_id, Payroll.month, Payroll.year, Payroll.gross_salary,
+                      Payroll.net_salary, Payroll.status),
+            joinedload(Payroll.user).load_only(User.name, User.employee_id)
+        ).filter(Payroll.payrun_id.in_([payrun.id for payrun in payruns])).order_by(Payroll.id)
+        for payroll in payslips:
+            payrun_payrolls.setdefault(payroll.payrun_id, []).append(payroll)
     
     # Get charts data - Employee count and employer cost
-    current_year = datetime.now().year
-    
-    # Employee count by month (current year)
-    employee_count_monthly = []
-    for month in range(1, 13):
-        count = User.query.filter(
-            User.role == 'Employee',
-            extract('year', User.date_of_joining) <= current_year,
-            db.or_(
-                extract('year', User.date_of_joining) < current_year,
-                extract('month', User.date_of_joining) <= month
-            )
-        ).count()
-        employee_count_monthly.append({'month': month, 'count': count})
-    
-    # Employer cost by month (current year)
-    employer_cost_monthly = []
-    for month in range(1, 13):
-        cost = db.session.query(func.sum(Payroll.gross_salary)).filter(
-            Payroll.year == current_year,
-            Payroll.month == month
-        ).scalar() or 0
-        employer_cost_monthly.append({'month': month, 'cost': float(cost)})
-    
-    # Employer cost by year (last 5 years)
-    employer_cost_annual = []
-    for year in range(current_year - 4, current_year + 1):
-        cost = db.session.query(func.sum(Payroll.gross_salary)).filter(
-            Payroll.year == year
-        ).scalar() or 0
-        employer_cost_annual.append({'year': year, 'cost': float(cost)})
+    charts = _dashboard_charts(datetime.now().year)
     
     return render_template('payroll/dashboard.html',
                          employees_without_bank=employees_without_bank,
                          employees_without_manager=employees_without_manager,
                          payruns=payruns,
-                         employee_count_monthly=employee_count_monthly,
-                         employer_cost_monthly=employer_cost_monthly,
-                         employer_cost_annual=employer_cost_annual)
+                         payrun_payrolls=payrun_payrolls,
+                         **charts)
+
+def _configured_user_ids(employees):
+    """Ids of the given employees whose salary structure is set, in one query.
+    Same test as generate() applies to a single employee (wage or basic_salary
+    non-zero), with PayrollSettings.wage - the sum of the active Fixed
+    components, else basic_salary - computed in SQL rather than one
+    components query per employee"""
+    ids = [emp.id for emp in employees]
+    if not ids:
+        return set()
+    fixed_total = db.select(func.coalesce(func.sum(SalaryComponent.value), 0)).where(
+        SalaryComponent.payroll_settings_id == PayrollSettings.id,
+        SalaryComponent.is_active == True,
+        SalaryComponent.computation_type == 'Fixed'
+    ).scalar_subquery()
+    return set(db.session.scalars(db.select(PayrollSettings.user_id).where(
+        PayrollSettings.user_id.in_(ids),
+        db.or_(
+            fixed_total > 0,
+            PayrollSettings.basic_salary == None,
+            PayrollSettings.basic_salary != 0
+        )
+    )))
+
+def _conditional_render(parts, template, load_context):
+    """Render template, or answer 304 when the browser's copy is current.
+
+    parts identify the data shown; the viewer is always added since the
+    page chrome (name, role-specific buttons) depends on them, and so is the
+    release, since the same data can render differently after a deploy. The
+    context is only loaded when the page is actually rendered.
+    """
+    # Pending flash messages are part of the page too; get_flashed_messages
+    # keeps them for the template rendered later in this request
+    parts = (*parts, current_user.id, current_user.updated_at,
+             current_app.config.get('RELEASE', ''), get_flashed_messages(with_categories=True))
+    etag = hashlib.md5(repr(parts).encode()).hexdigest()
+    stamps = [p for p in parts if isinstance(p, datetime)]
+    last_modified = max(stamps).replace(tzinfo=timezone.utc, microsecond=0) if stamps else None
+    
+    if not is_resource_modified(
+        request.environ, etag=etag, last_modified=last_modified
+    ):
+        response = make_response('', 304)
+    else:
+        response = make_response(render_template(template, **load_context()))
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Payslips are personal: keep them out of shared caches and have the
+    # browser revalidate on every visit
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def _render_generate_form():
+    """The generate page; also re-rendered in place when a POST fails
+    validation, with the submitted choices kept selected"""
+    employees = get_employee_roster()
+    configured_ids = _configured_user_ids(employees)
+    employees_without_salary = [emp for emp in employees if emp.id not in configured_ids]
+    
+    return render_template('payroll/generate.html', 
+                         employees=employees,
+                         employees_without_salary=employees_without_salary,
+                         configured_ids=configured_ids)
 
 @bp.route('/generate', methods=['GET', 'POST'])
 @login_required
@@ -97,36 +257,38 @@ def generate():
         if errors:
             for error in errors:
                 flash(error, 'danger')
-            return redirect(url_for('payroll.generate'))
+            return _render_generate_form()
         
-        user = User.query.get(int(user_id))
+        user = db.session.get(User, int(user_id))
         if not user:
             flash('Employee not found', 'danger')
-            return redirect(url_for('payroll.generate'))
+            return _render_generate_form()
         
-        # Check if payroll already exists
-        existing = Payroll.query.filter_by(
-            user_id=user_id,
+        # Check if payroll already exists - only its id is needed for the
+        # redirect, and the (user_id, month, year) unique constraint's index
+        # answers this without reading the payroll row
+        existing_id = db.session.query(Payroll.id).filter_by(
+            user_id=user.id,
             month=int(month),
             year=int(year)
-        ).first()
+        ).scalar()
         
-        if existing:
+        if existing_id:
             flash('Payroll for this month already exists', 'warning')
-            return redirect(url_for('payroll.edit', payroll_id=existing.id))
+            return redirect(url_for('payroll.edit', payroll_id=existing_id))
         
         # Get payroll settings
         settings = PayrollSettings.query.filter_by(user_id=user_id).first()
         if not settings or (settings.wage == 0 and settings.basic_salary == 0):
             flash(f'Please set salary structure for {user.name} first', 'danger')
-            return redirect(url_for('payroll.generate'))
+            return _render_generate_form()
         
         # Calculate salary
         salary_data = calculate_monthly_salary(user_id, int(month), int(year), settings)
         
         if not salary_data:
             flash('Error calculating salary', 'danger')
-            return redirect(url_for('payroll.generate'))
+            return _render_generate_form()
         
         # Get or create payrun for this month/year
         from app.models import Payrun
@@ -141,56 +303,44 @@ def generate():
             db.session.add(payrun)
             db.session.flush()
         
-        # Create payroll record
-        payroll = Payroll(
-            user_id=user_id,
-            month=int(month),
-            year=int(year),
-            payrun_id=payrun.id,
-            basic_salary=salary_data['basic_salary'],
-            hra=salary_data['hra'],
-            conveyance=salary_data['conveyance'],
-            other_allowances=salary_data['other_allowances'],
-            gross_salary=salary_data['gross_salary'],
-            pf_contribution=salary_data['pf_contribution'],
-            professional_tax=salary_data['professional_tax'],
-            other_deductions=salary_data['other_deductions'],
-            total_deductions=salary_data['total_deductions'],
-            net_salary=salary_data['net_salary'],
-            status='Unpaid'
-        )
-        
-        db.session.add(payroll)
-        
-        # Update payrun count
-        payrun.payslip_count = Payroll.query.filter_by(payrun_id=payrun.id).count() + 1
+        # Create payroll record - a plain INSERT ... RETURNING id, since the
+        # new row is only redirected to; the same statement takes a list of
+        # rows when payslips are generated in bulk
+        payroll_id = db.session.execute(insert(Payroll).returning(Payroll.id), {
+            'user_id': user.id,
+            'month': int(month),
+            'year': int(year),
+            'payrun_id': payrun.id,
+            'basic_salary': salary_data['basic_salary'],
+            'hra': salary_data['hra'],
+            'conveyance': salary_data['conveyance'],
+            'other_allowances': salary_data['other_allowances'],
+            'gross_salary': salary_data['gross_salary'],
+            'pf_contribution': salary_data['pf_contribution'],
+            'professional_tax': salary_data['professional_tax'],
+            'other_deductions': salary_data['other_deductions'],
+            'total_deductions': salary_data['total_deductions'],
+            'net_salary': salary_data['net_salary'],
+            'status': 'Unpaid'
+        }).scalar_one()
+        
+        # Update payrun count in SQL (payslip_count = payslip_count + 1), so
+        # concurrent generates for the same month don't overwrite each other
+        payrun.payslip_count = func.coalesce(Payrun.payslip_count, 0) + 1
         
         db.session.commit()
+        dashboard_cache.clear()
         
         flash('Payroll generated successfully!', 'success')
-        return redirect(url_for('payroll.view', payroll_id=payroll.id))
-    
-    # GET request
-    employees = User.query.filter_by(role='Employee').order_by(User.name).all()
-    # Get employees without salary structure and create employee settings map
-    employees_without_salary = []
-    employee_settings_map = {}
-    for emp in employees:
-        settings = PayrollSettings.query.filter_by(user_id=emp.id).first()
-        employee_settings_map[emp.id] = settings
-        if not settings or (settings.wage == 0 and settings.basic_salary == 0):
-            employees_without_salary.append(emp)
+        return redirect(url_for('payroll.view', payroll_id=payroll_id))
     
-    return render_template('payroll/generate.html', 
-                         employees=employees,
-                         employees_without_salary=employees_without_salary,
-                         employee_settings_map=employee_settings_map)
+    return _render_generate_form()
 
 @bp.route('/<int:payroll_id>/view')
 @login_required
 @employee_or_above_required
 def view(payroll_id):
-    payroll = Payroll.query.get_or_404(payroll_id)
+    payroll = db.get_or_404(Payroll, payroll_id)
     
     # Employees can only view their own payslips
     # HR Officer cannot view payroll
@@ -200,17 +350,19 @@ def view(payroll_id):
     if current_user.role == 'HR Officer':
         abort(403)
     
-    return render_template('payroll/payslip.html', payroll=payroll)
+    return _conditional_render(
+        (payroll.id, payroll.updated_at, payroll.user.updated_at),
+        'payroll/payslip.html', lambda: {'payroll': payroll}
+    )
 
 @bp.route('/<int:payroll_id>/mark-paid', methods=['POST'])
 @login_required
 @role_required(['Admin', 'Payroll Officer'])
 def mark_paid(payroll_id):
     # Only Admin and Payroll Officer can mark as paid
-    payroll = Payroll.query.get_or_404(payroll_id)
+    payroll = db.get_or_404(Payroll, payroll_id)
     
     payroll.status = 'Paid'
-    payroll.updated_at = datetime.utcnow()
     
     db.session.commit()
     flash('Payslip marked as paid successfully!', 'success')
@@ -221,7 +373,7 @@ def mark_paid(payroll_id):
 @employee_or_above_required
 def download_pdf(payroll_id):
     """Download payslip as PDF"""
-    payroll = Payroll.query.get_or_404(payroll_id)
+    payroll = db.get_or_404(Payroll, payroll_id)
     
     # Employees can only download their own payslips
     # HR Officer cannot access payroll
@@ -372,45 +524,62 @@ def download_pdf(payroll_id):
     
     return response
 
+def _parse_amount(raw, default, label, errors):
+    """Number typed into a form field; a blank field means the default, while
+    anything unreadable ("12,000", "x") is reported in errors instead of being
+    saved as some other amount"""
+    raw = (raw or '').strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        value = None
+    if value is None or not math.isfinite(value):
+        errors.append(f'{label} must be a number')
+        return default
+    return value
+
 @bp.route('/<int:payroll_id>/edit', methods=['GET', 'POST'])
 @login_required
 @role_required(['Admin', 'Payroll Officer'])
 def edit(payroll_id):
     # Only Admin and Payroll Officer can edit payroll
-    payroll = Payroll.query.get_or_404(payroll_id)
-    
     if request.method == 'POST':
-        basic_salary = float(request.form.get('basic_salary', 0))
-        hra = float(request.form.get('hra', 0))
-        conveyance = float(request.form.get('conveyance', 0))
-        other_allowances = float(request.form.get('other_allowances', 0))
-        pf_contribution = float(request.form.get('pf_contribution', 0))
-        professional_tax = float(request.form.get('professional_tax', 0))
-        other_deductions = float(request.form.get('other_deductions', 0))
+        errors = []
+        amounts = {
+            field: _parse_amount(request.form.get(field), 0.0, _FIELD_LABELS[field], errors)
+            for field in _EARNING_FIELDS + _DEDUCTION_FIELDS
+        }
         status = request.form.get('status', 'Unpaid')
         
-        # Recalculate
-        gross_salary = basic_salary + hra + conveyance + other_allowances
-        total_deductions = pf_contribution + professional_tax + other_deductions
-        net_salary = gross_salary - total_deductions
-        
-        payroll.basic_salary = basic_salary
-        payroll.hra = hra
-        payroll.conveyance = conveyance
-        payroll.other_allowances = other_allowances
-        payroll.gross_salary = gross_salary
-        payroll.pf_contribution = pf_contribution
-        payroll.professional_tax = professional_tax
-        payroll.other_deductions = other_deductions
-        payroll.total_deductions = total_deductions
-        payroll.net_salary = net_salary
-        payroll.status = status
-        payroll.updated_at = datetime.utcnow()
-        
-        db.session.commit()
-        flash('Payroll updated successfully!', 'success')
-        return redirect(url_for('payroll.view', payroll_id=payroll.id))
+        if errors:
+            for error in errors:
+                flash(error, 'danger')
+        else:
+            # Recalculate
+            gross_salary = sum(amounts[field] for field in _EARNING_FIELDS)
+            total_deductions = sum(amounts[field] for field in _DEDUCTION_FIELDS)
+            net_salary = gross_salary - total_deductions
+            
+            # Single UPDATE by primary key - the payslip isn't loaded on POST
+            result = db.session.execute(update(Payroll).where(Payroll.id == payroll_id).values(
+                **amounts,
+                gross_salary=gross_salary,
+                total_deductions=total_deductions,
+                net_salary=net_salary,
+                status=status
+            ))
+            if result.rowcount == 0:
+                db.session.rollback()
+                abort(404)
+            
+            db.session.commit()
+            dashboard_cache.clear()
+            flash('Payroll updated successfully!', 'success')
+            return redirect(url_for('payroll.view', payroll_id=payroll_id))
     
+    payroll = db.get_or_404(Payroll, payroll_id)
     return render_template('payroll/edit.html', payroll=payroll)
 
 @bp.route('/my-payslips')
@@ -418,11 +587,27 @@ def edit(payroll_id):
 @role_required(['Employee'])
 def my_payslips():
     # Only employees can access their own payslips
-    payrolls = Payroll.query.filter_by(user_id=current_user.id).order_by(
+    page = request.args.get('page', 1, type=int)
+    # Count and newest edit of the user's payslips decide whether the
+    # browser's copy of this page is still current
+    count, last_updated = db.session.query(
+        func.count(Payroll.id), func.max(Payroll.updated_at)
+    ).filter_by(user_id=current_user.id).one()
+    
+    return _conditional_render(
+        (page, count, last_updated),
+        'payroll/my_payslips.html', lambda: _my_payslips_page(page)
+    )
+
+def _my_payslips_page(page):
+    # Only the columns shown in the table
+    pagination = Payroll.query.options(
+        load_only(Payroll.month, Payroll.year, Payroll.gross_salary, Payroll.total_deductions,
+                  Payroll.net_salary, Payroll.status)
+    ).filter_by(user_id=current_user.id).order_by(
         Payroll.year.desc(), Payroll.month.desc()
-    ).all()
-    
-    return render_template('payroll/my_payslips.html', payrolls=payrolls)
+    ).paginate(page=page, per_page=_PER_PAGE, error_out=False)
+    return {'payrolls': pagination.items, 'pagination': pagination}
 
 @bp.route('/salary-structure', methods=['GET', 'POST'])
 @login_required
@@ -431,18 +616,36 @@ def salary_structure_list():
     # Only Admin and Payroll Officer can manage salary structures
     # HR Officer cannot access
     """List all employees and their salary structures"""
-    employees = User.query.filter_by(role='Employee').order_by(User.name).all()
-    employee_settings = {}
-    for emp in employees:
-        settings = PayrollSettings.query.filter_by(user_id=emp.id).first()
-        if settings:
-            # Safely get component count
-            try:
-                settings.component_count = settings.salary_components.count()
-            except Exception:
-                # Table doesn't exist
-                settings.component_count = 0
-        employee_settings[emp.id] = settings
+    employees = get_employee_roster()
+    employee_settings = _settings_by_user(employees)
+    
+    # Component count and active Fixed total of every listed structure in one
+    # grouped query, instead of a count and a wage (components) query per row
+    totals = {}
+    if employee_settings:
+        try:
+            totals = {settings_id: (count, fixed_total) for settings_id, count, fixed_total in db.session.query(
+                SalaryComponent.payroll_settings_id,
+                func.count(SalaryComponent.id),
+                func.sum(case(
+                    ((SalaryComponent.is_active == True) & (SalaryComponent.computation_type == 'Fixed'),
+                     SalaryComponent.value),
+                    else_=0
+                ))
+            ).filter(
+                SalaryComponent.payroll_settings_id.in_([s.id for s in employee_settings.values()])
+            ).group_by(SalaryComponent.payroll_settings_id)}
+        except (OperationalError, InternalError, ProgrammingError):
+            # Table doesn't exist
+            db.session.rollback()
+    
+    for settings in employee_settings.values():
+        count, fixed_total = totals.get(settings.id, (0, 0))
+        settings.component_count = count
+        # Same value the wage property would compute: active Fixed components
+        # when they add up to something, else the legacy basic salary
+        fixed_total = float(fixed_total or 0)
+        settings.wage = fixed_total if fixed_total > 0 else settings.basic_salary
     
     return render_template('payroll/salary_structure_list.html', 
                          employees=employees,
@@ -457,7 +660,7 @@ def salary_structure(user_id):
     """Set or update salary structure for an employee"""
     from decimal import Decimal
     
-    user = User.query.get_or_404(user_id)
+    user = db.get_or_404(User, user_id)
     
     # Salary structure can only be set for employees
     if user.role != 'Employee':
@@ -465,16 +668,6 @@ def salary_structure(user_id):
     
     settings = PayrollSettings.query.filter_by(user_id=user_id).first()
     
-    # Default component definitions
-    DEFAULT_COMPONENTS = [
-        {'name': 'Basic', 'computation_type': 'Percentage', 'value': 50.0, 'base_for_percentage': 'Wage', 'display_order': 1},
-        {'name': 'House Rent Allowance', 'computation_type': 'Percentage', 'value': 50.0, 'base_for_percentage': 'Basic', 'display_order': 2},
-        {'name': 'Standard Allowance', 'computation_type': 'Fixed', 'value': 4167.0, 'base_for_percentage': 'Wage', 'display_order': 3},
-        {'name': 'Performance Bonus', 'computation_type': 'Percentage', 'value': 8.33, 'base_for_percentage': 'Wage', 'display_order': 4},
-        {'name': 'Leave Travel Allowance', 'computation_type': 'Percentage', 'value': 8.333, 'base_for_percentage': 'Wage', 'display_order': 5},
-        {'name': 'Fixed Allowance', 'computation_type': 'Fixed', 'value': 0.0, 'base_for_percentage': 'Wage', 'display_order': 6},  # Will be calculated as remaining
-    ]
-    
     if not settings:
         # Create new settings with default wage
         settings = PayrollSettings(
@@ -487,33 +680,28 @@ def salary_structure(user_id):
         db.session.add(settings)
         db.session.flush()
         
-        # Create default components if they don't exist
-        for comp_def in DEFAULT_COMPONENTS:
-            component = SalaryComponent(
-                payroll_settings_id=settings.id,
-                name=comp_def['name'],
-                computation_type=comp_def['computation_type'],
-                value=comp_def['value'],
-                base_for_percentage=comp_def['base_for_percentage'],
-                display_order=comp_def['display_order']
-            )
-            db.session.add(component)
+        # Create default components if they don't exist, as one multi-row INSERT
+        db.session.execute(insert(SalaryComponent), [
+            dict(comp_def, payroll_settings_id=settings.id) for comp_def in _DEFAULT_COMPONENTS
+        ])
         db.session.commit()
     
     if request.method == 'POST':
-        wage = float(request.form.get('wage', 0))
-        pf_percentage = float(request.form.get('pf_percentage', 12.0))
-        professional_tax_amount = float(request.form.get('professional_tax_amount', 200.0))
-        
         errors = []
-        
-        if wage <= 0:
+        wage = _parse_amount(request.form.get('wage'), 0.0, _FIELD_LABELS['wage'], errors)
+        pf_percentage = _parse_amount(request.form.get('pf_percentage'), 12.0, _FIELD_LABELS['pf_percentage'], errors)
+        professional_tax_amount = _parse_amount(request.form.get('professional_tax_amount'), 200.0,
+                                                _FIELD_LABELS['professional_tax_amount'], errors)
+        # Range and total checks only mean something for amounts that were read
+        amounts_readable = not errors
+        
+        if amounts_readable and wage <= 0:
             errors.append('Wage must be greater than 0')
         
-        if pf_percentage < 0 or pf_percentage > 100:
+        if amounts_readable and (pf_percentage < 0 or pf_percentage > 100):
             errors.append('PF percentage must be between 0 and 100')
         
-        if professional_tax_amount < 0:
+        if amounts_readable and professional_tax_amount < 0:
             errors.append('Professional tax cannot be negative')
         
         # Get component data from form
@@ -525,43 +713,43 @@ def salary_structure(user_id):
         
         # Validate and process components
         components_data = []
-        
-        # First pass: Store all component data
-        for i, name in enumerate(component_names):
-            if i < len(component_types) and i < len(component_values) and i < len(component_bases):
-                comp_type = component_types[i]
-                try:
-                    comp_value = float(component_values[i])
-                except (ValueError, TypeError):
-                    comp_value = 0.0
-                comp_base = component_bases[i] if i < len(component_bases) else 'Wage'
-                comp_order = int(component_orders[i]) if i < len(component_orders) and component_orders[i] else i + 1
-                
-                components_data.append({
-                    'name': name,
-                    'type': comp_type,
-                    'value': comp_value,
-                    'base': comp_base,
-                    'order': comp_order,
-                    'amount': 0.0  # Will be calculated
-                })
-        
-        # Second pass: Calculate Basic first
         basic_amount = 0.0
-        for comp in components_data:
-            if comp['name'] == 'Basic':
-                if comp['type'] == 'Percentage':
-                    basic_amount = wage * comp['value'] / 100.0
+        basic_found = False
+        
+        # First pass: Store all component data, calculating Basic (the first
+        # component of that name) as soon as it is read. The posted lists are
+        # parallel; zip stops at the shortest, dropping incomplete rows
+        rows = zip(component_names, component_types, component_values, component_bases)
+        for i, (name, comp_type, raw_value, comp_base) in enumerate(rows):
+            comp_value = _parse_amount(raw_value, 0.0, f'Value of {name or "component"}', errors)
+            comp_order = int(component_orders[i]) if i < len(component_orders) and component_orders[i] else i + 1
+            
+            comp = {
+                'name': name,
+                'type': comp_type,
+                'value': comp_value,
+                'base': comp_base,
+                'order': comp_order,
+                'amount': 0.0  # Will be calculated
+            }
+            if name == 'Basic' and not basic_found:
+                if comp_type == 'Percentage':
+                    basic_amount = wage * comp_value / 100.0
                 else:
-                    basic_amount = comp['value']
+                    basic_amount = comp_value
                 comp['amount'] = basic_amount
-                break
+                basic_found = True
+            components_data.append(comp)
         
-        # Third pass: Calculate all other components
+        # Second pass: Calculate all other components (percentages of Basic
+        # need basic_amount, so this can't be folded into the first pass)
         total_components = 0.0
+        fixed_allowance = None
         for comp in components_data:
             if comp['name'] == 'Fixed Allowance':
-                # Skip Fixed Allowance for now
+                # Calculated last, from what remains of the wage
+                if fixed_allowance is None:
+                    fixed_allowance = comp
                 continue
             
             if comp['amount'] > 0:
@@ -577,17 +765,15 @@ def salary_structure(user_id):
                     comp['amount'] = wage * comp['value'] / 100.0
                 total_components += comp['amount']
         
-        # Fourth pass: Calculate Fixed Allowance (remaining amount)
-        remaining = wage - total_components
-        for comp in components_data:
-            if comp['name'] == 'Fixed Allowance':
-                comp['amount'] = max(0, remaining)  # Ensure non-negative
-                comp['value'] = comp['amount']  # Update the value to the calculated amount
-                total_components += comp['amount']
-                break
+        # Fixed Allowance takes the remaining amount
+        if fixed_allowance is not None:
+            remaining = wage - total_components
+            fixed_allowance['amount'] = max(0, remaining)  # Ensure non-negative
+            fixed_allowance['value'] = fixed_allowance['amount']  # Update the value to the calculated amount
+            total_components += fixed_allowance['amount']
         
         # Validate total doesn't exceed wage
-        if total_components > wage + 0.01:  # Allow small floating point differences
+        if amounts_readable and total_components > wage + 0.01:  # Allow small floating point differences
             errors.append(f'Total of all components (₹{total_components:,.2f}) exceeds wage (₹{wage:,.2f})')
         
         if errors:
@@ -599,7 +785,6 @@ def salary_structure(user_id):
             settings.wage_type = 'Fixed'
             settings.pf_percentage = pf_percentage
             settings.professional_tax_amount = professional_tax_amount
-            settings.updated_at = datetime.utcnow()
             
             # Delete existing components and recreate
             try:
@@ -628,16 +813,16 @@ def salary_structure(user_id):
                 except:
                     db.session.rollback()
             
-            for comp_data in components_data:
-                component = SalaryComponent(
-                    payroll_settings_id=settings.id,
-                    name=comp_data['name'],
-                    computation_type=comp_data['type'],
-                    value=comp_data['value'],
-                    base_for_percentage=comp_data['base'],
-                    display_order=comp_data['order']
-                )
-                db.session.add(component)
+            # Recreate them with one multi-row INSERT
+            if components_data:
+                db.session.execute(insert(SalaryComponent), [{
+                    'payroll_settings_id': settings.id,
+                    'name': comp_data['name'],
+                    'computation_type': comp_data['type'],
+                    'value': comp_data['value'],
+                    'base_for_percentage': comp_data['base'],
+                    'display_order': comp_data['order']
+                } for comp_data in components_data])
             
             db.session.commit()
             flash(f'Salary structure for {user.name} updated successfully!', 'success')
@@ -658,19 +843,8 @@ def salary_structure(user_id):
             # Silently use default components if table doesn't exist
             components = []
     if not components:
-        # Create default components for display
-        components = []
-        for comp_def in DEFAULT_COMPONENTS:
-            components.append(type('Component', (), {
-                'name': comp_def['name'],
-                'computation_type': comp_def['computation_type'],
-                'value': comp_def['value'],
-                'base_for_percentage': comp_def['base_for_percentage'],
-                'display_order': comp_def['display_order']
-            })())
-    
-    # Sort components by display order
-    components = sorted(components, key=lambda x: x.display_order)
+        # Default components for display
+        components = _DEFAULT_COMPONENT_OBJECTS
     
     return render_template('payroll/salary_structure.html', user=user, settings=settings, components=components)
 
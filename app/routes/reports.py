@@ -3,11 +3,32 @@ from flask_login import login_required, current_user
 from app import db
 from app.models import Attendance, Leave, Payroll, User
 from app.utils.decorators import employee_or_above_required, payroll_required, role_required
+from app.utils.employee_utils import get_employee_roster
 from datetime import datetime, date, timedelta
-from sqlalchemy import func, or_, and_
+from sqlalchemy import func, case
 
 bp = Blueprint('reports', __name__)
 
+_MONTH_ABBRS = ('', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Report rows per page; the stat cards cover every matching row
+_PER_PAGE = 50
+
+def _parse_date(value):
+    """Parse a YYYY-MM-DD filter argument; None when missing or invalid.
+    date.fromisoformat handles what the date inputs send, strptime only
+    catches hand-typed dates without zero padding (2024-1-5)"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
 @bp.route('/')
 @login_required
 @role_required(['Admin', 'Payroll Officer'])
@@ -33,36 +54,38 @@ def attendance():
         query = query.filter_by(user_id=user_id)
     
     # Filter by date range
-    if start_date:
-        try:
-            start = datetime.strptime(start_date, '%Y-%m-%d').date()
-            query = query.filter(Attendance.date >= start)
-        except ValueError:
-            pass
-    
-    if end_date:
-        try:
-            end = datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(Attendance.date <= end)
-        except ValueError:
-            pass
-    
-    attendances = query.order_by(Attendance.date.desc()).all()
-    
-    # Calculate statistics
-    total_days = len(attendances)
-    present_days = sum(1 for a in attendances if a.status == 'Present')
-    absent_days = sum(1 for a in attendances if a.status == 'Absent')
-    half_days = sum(1 for a in attendances if a.status == 'Half Day')
-    total_hours = sum(a.working_hours for a in attendances)
+    start = _parse_date(start_date)
+    if start:
+        query = query.filter(Attendance.date >= start)
+    
+    end = _parse_date(end_date)
+    if end:
+        query = query.filter(Attendance.date <= end)
+    
+    # Rows are the displayed columns only, one page at a time
+    page = request.args.get('page', 1, type=int)
+    pagination = query.join(User, Attendance.user_id == User.id).with_entities(
+        User.name.label('user_name'), Attendance.date, Attendance.check_in, Attendance.check_out,
+        Attendance.working_hours, Attendance.status
+    ).order_by(Attendance.date.desc()).paginate(page=page, per_page=_PER_PAGE, error_out=False)
+    
+    # Calculate statistics in SQL over the same filters
+    total_days, present_days, absent_days, half_days, total_hours = query.with_entities(
+        func.count(Attendance.id),
+        func.coalesce(func.sum(case((Attendance.status == 'Present', 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Attendance.status == 'Absent', 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Attendance.status == 'Half Day', 1), else_=0)), 0),
+        func.coalesce(func.sum(Attendance.working_hours), 0.0)
+    ).one()
     
     # Get users for filter
     users = []
     if current_user.role in ['Admin', 'HR Officer', 'Payroll Officer']:
-        users = User.query.filter_by(role='Employee').order_by(User.name).all()
+        users = get_employee_roster()
     
     return render_template('reports/attendance_report.html',
-                         attendances=attendances,
+                         attendances=pagination.items,
+                         pagination=pagination,
                          start_date=start_date,
                          end_date=end_date,
                          user_id=user_id,
@@ -95,36 +118,40 @@ def leave():
         query = query.filter_by(status=status_filter)
     
     # Filter by date range
-    if start_date:
-        try:
-            start = datetime.strptime(start_date, '%Y-%m-%d').date()
-            query = query.filter(Leave.start_date >= start)
-        except ValueError:
-            pass
-    
-    if end_date:
-        try:
-            end = datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(Leave.end_date <= end)
-        except ValueError:
-            pass
-    
-    leaves = query.order_by(Leave.created_at.desc()).all()
-    
-    # Calculate statistics
-    total_leaves = len(leaves)
-    approved_leaves = sum(1 for l in leaves if l.status == 'Approved')
-    rejected_leaves = sum(1 for l in leaves if l.status == 'Rejected')
-    pending_leaves = sum(1 for l in leaves if l.status == 'Pending')
-    total_days = sum((l.end_date - l.start_date).days + 1 for l in leaves if l.status == 'Approved')
+    start = _parse_date(start_date)
+    if start:
+        query = query.filter(Leave.start_date >= start)
+    
+    end = _parse_date(end_date)
+    if end:
+        query = query.filter(Leave.end_date <= end)
+    
+    # Displayed columns only, one page at a time
+    page = request.args.get('page', 1, type=int)
+    pagination = query.join(User, Leave.user_id == User.id).with_entities(
+        User.name.label('user_name'), Leave.leave_type, Leave.start_date, Leave.end_date, Leave.status
+    ).order_by(Leave.created_at.desc()).paginate(page=page, per_page=_PER_PAGE, error_out=False)
+    
+    # Calculate statistics in SQL over the same filters; days are inclusive
+    # of both ends (date - date is a day count in Postgres)
+    total_leaves, approved_leaves, rejected_leaves, pending_leaves, total_days = query.with_entities(
+        func.count(Leave.id),
+        func.coalesce(func.sum(case((Leave.status == 'Approved', 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Leave.status == 'Rejected', 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Leave.status == 'Pending', 1), else_=0)), 0),
+        func.coalesce(func.sum(case(
+            (Leave.status == 'Approved', Leave.end_date - Leave.start_date + 1), else_=0
+        )), 0)
+    ).one()
     
     # Get users for filter
     users = []
     if current_user.role in ['Admin', 'HR Officer', 'Payroll Officer']:
-        users = User.query.filter_by(role='Employee').order_by(User.name).all()
+        users = get_employee_roster()
     
     return render_template('reports/leave_report.html',
-                         leaves=leaves,
+                         leaves=pagination.items,
+                         pagination=pagination,
                          start_date=start_date,
                          end_date=end_date,
                          user_id=user_id,
@@ -153,37 +180,40 @@ def payroll():
     if user_id:
         query = query.filter_by(user_id=user_id)
     
-    # Filter by date range
+    # Filter by date range - a single range on the month count year * 12 +
+    # month (matches the ix_payroll_period expression index)
+    period = Payroll.year * 12 + Payroll.month
     if start_year and start_month:
-        query = query.filter(
-            or_(
-                Payroll.year > int(start_year),
-                and_(Payroll.year == int(start_year), Payroll.month >= int(start_month))
-            )
-        )
+        query = query.filter(period >= int(start_year) * 12 + int(start_month))
     
     if end_year and end_month:
-        query = query.filter(
-            or_(
-                Payroll.year < int(end_year),
-                and_(Payroll.year == int(end_year), Payroll.month <= int(end_month))
-            )
-        )
-    
-    payrolls = query.order_by(Payroll.year.desc(), Payroll.month.desc()).all()
-    
-    # Calculate statistics
-    total_payrolls = len(payrolls)
-    total_gross = sum(float(p.gross_salary) for p in payrolls)
-    total_deductions = sum(float(p.total_deductions) for p in payrolls)
-    total_net = sum(float(p.net_salary) for p in payrolls)
-    paid_count = sum(1 for p in payrolls if p.status == 'Paid')
+        query = query.filter(period <= int(end_year) * 12 + int(end_month))
+    
+    # Displayed columns only, one page at a time
+    page = request.args.get('page', 1, type=int)
+    pagination = query.join(User, Payroll.user_id == User.id).with_entities(
+        User.name.label('user_name'), Payroll.month, Payroll.year, Payroll.gross_salary,
+        Payroll.total_deductions, Payroll.net_salary, Payroll.status
+    ).order_by(Payroll.year.desc(), Payroll.month.desc()).paginate(page=page, per_page=_PER_PAGE, error_out=False)
+    
+    # Calculate statistics in SQL over the same filters
+    total_payrolls, total_gross, total_deductions, total_net, paid_count = query.with_entities(
+        func.count(Payroll.id),
+        func.coalesce(func.sum(Payroll.gross_salary), 0),
+        func.coalesce(func.sum(Payroll.total_deductions), 0),
+        func.coalesce(func.sum(Payroll.net_salary), 0),
+        func.coalesce(func.sum(case((Payroll.status == 'Paid', 1), else_=0)), 0)
+    ).one()
+    total_gross = float(total_gross)
+    total_deductions = float(total_deductions)
+    total_net = float(total_net)
     
     # Get users for filter
-    users = User.query.filter_by(role='Employee').order_by(User.name).all()
+    users = get_employee_roster()
     
     return render_template('reports/payroll_report.html',
-                         payrolls=payrolls,
+                         payrolls=pagination.items,
+                         pagination=pagination,
                          start_month=start_month,
                          start_year=start_year,
                          end_month=end_month,
@@ -206,7 +236,7 @@ def salary_statement():
     year_filter = request.args.get('year', '')
     
     # Get employees for dropdown
-    employees = User.query.filter_by(role='Employee').order_by(User.name).all()
+    employees = get_employee_roster()
     
     # Get years for dropdown (last 5 years)
     current_year = datetime.now().year
@@ -325,8 +355,6 @@ def salary_statement_pdf():
     # Monthly Breakdown
     story.append(Paragraph("<b>Monthly Breakdown</b>", styles['Heading3']))
     
-    month_names = ['', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-    
     monthly_data = [['Month', 'Gross Salary (₹)', 'Deductions (₹)', 'Net Salary (₹)']]
     
     total_gross = 0
@@ -335,7 +363,7 @@ def salary_statement_pdf():
     
     for payroll in payrolls:
         monthly_data.append([
-            month_names[payroll.month],
+            _MONTH_ABBRS[payroll.month],
             f"{payroll.gross_salary:,.2f}",
             f"{payroll.total_deductions:,.2f}",
             f"{payroll.net_salary:,.2f}"
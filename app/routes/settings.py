@@ -4,7 +4,7 @@ from app import db
 from app.models import User
 from app.utils.decorators import employee_or_above_required
 from app.utils.validators import validate_email, validate_password, validate_phone
-from datetime import datetime
+from datetime import date
 
 bp = Blueprint('settings', __name__)
 
@@ -62,7 +62,7 @@ def update_private_info():
     
     if date_of_birth:
         try:
-            user.date_of_birth = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
+            user.date_of_birth = date.fromisoformat(date_of_birth)
         except ValueError:
             errors.append('Invalid date of birth format')
     
@@ -98,7 +98,6 @@ def update_private_info():
         user.gender = gender if gender else None
         user.marital_status = marital_status if marital_status else None
         user.address = request.form.get('address', '').strip() or None
-        user.updated_at = datetime.utcnow()
         
         db.session.commit()
         flash('Personal information updated successfully!', 'success')
@@ -122,7 +121,6 @@ def update_salary_info():
     user.ifsc_code = ifsc_code if ifsc_code else None
     user.pan_number = pan_number if pan_number else None
     user.uan_number = uan_number if uan_number else None
-    user.updated_at = datetime.utcnow()
     
     db.session.commit()
     flash('Bank details updated successfully!', 'success')
@@ -0,0 +1,51 @@
+"""
+Small in-process TTL cache for read-heavy views
+
+Each worker process keeps its own copy. Views that write the underlying data
+call clear(), but that only empties the copy in the worker that handled the
+write: every other worker keeps serving its entry until the timeout runs out,
+so a value can be up to `timeout` seconds (60 for the caches below) stale.
+"""
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe dict whose entries expire after `timeout` seconds"""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Live employee statuses shown in the Employee Directory
+directory_cache = TTLCache(timeout=60)
+
+# Employee roster (id, name, login ID, email) for the payroll pages and the
+# report filters; cleared when users are created, edited or deleted
+roster_cache = TTLCache(timeout=60)
+
+# Payroll dashboard chart series; cleared when payslips are generated or edited
+# and when users are created, edited or deleted
+dashboard_cache = TTLCache(timeout=60)
@@ -31,25 +31,25 @@ def calculate_net_salary(gross_salary, pf_contribution, professional_tax, other_
     net = gross - total_deductions
     return net, total_deductions
 
+def month_bounds(month, year):
+    """Return (first day of the month, first day of the next month)"""
+    return date(year, month, 1), date(year + (month == 12), month % 12 + 1, 1)
+
 def get_attendance_days(user_id, month, year):
     """Get number of present days for a user in a given month/year"""
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = date(year, month + 1, 1) - timedelta(days=1)
+    start_date, next_month_start = month_bounds(month, year)
     
     present_days = Attendance.query.filter(
         Attendance.user_id == user_id,
         Attendance.date >= start_date,
-        Attendance.date <= end_date,
+        Attendance.date < next_month_start,
         Attendance.status == 'Present'
     ).count()
     
     half_days = Attendance.query.filter(
         Attendance.user_id == user_id,
         Attendance.date >= start_date,
-        Attendance.date <= end_date,
+        Attendance.date < next_month_start,
         Attendance.status == 'Half Day'
     ).count()
     
@@ -69,16 +69,13 @@ def get_approved_leaves(user_id, month, year):
     """Get number of approved leave days for a user in a given month/year
     Returns: (paid_leave_days, unpaid_leave_days)
     """
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = date(year, month + 1, 1) - timedelta(days=1)
+    start_date, next_month_start = month_bounds(month, year)
+    end_date = next_month_start - timedelta(days=1)
     
     leaves = Leave.query.filter(
         Leave.user_id == user_id,
         Leave.status == 'Approved',
-        Leave.start_date <= end_date,
+        Leave.start_date < next_month_start,
         Leave.end_date >= start_date
     ).all()
     
@@ -113,11 +110,8 @@ def calculate_monthly_salary(user_id, month, year, settings):
     paid_leave_days, unpaid_leave_days = get_approved_leaves(user_id, month, year)
     
     # Calculate working days in month (excluding weekends)
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = date(year, month + 1, 1) - timedelta(days=1)
+    start_date, next_month_start = month_bounds(month, year)
+    end_date = next_month_start - timedelta(days=1)
     
     # Count total weekdays in month
     total_weekdays = count_weekdays(start_date, end_date)
@@ -14,6 +14,9 @@ from functools import wraps
 from flask import abort, jsonify, request
 from flask_login import current_user
 
+HR_ROLES = frozenset({'Admin', 'HR Officer'})
+PAYROLL_ROLES = frozenset({'Admin', 'Payroll Officer'})
+
 
 def role_required(allowed_roles):
     """
@@ -29,6 +32,12 @@ def role_required(allowed_roles):
         def some_route():
             ...
     """
+    # Convert single role to a set once, when the route is decorated
+    if isinstance(allowed_roles, str):
+        roles = frozenset([allowed_roles])
+    else:
+        roles = frozenset(allowed_roles)
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -38,12 +47,6 @@ def role_required(allowed_roles):
                     return jsonify({'error': 'Unauthorized', 'message': 'Please log in to access this resource'}), 401
                 abort(401)
             
-            # Convert single role to list
-            if isinstance(allowed_roles, str):
-                roles = [allowed_roles]
-            else:
-                roles = allowed_roles
-            
             # Admin always has access
             if current_user.role == 'Admin':
                 return f(*args, **kwargs)
@@ -86,7 +89,7 @@ def hr_required(f):
                 return jsonify({'error': 'Unauthorized', 'message': 'Please log in to access this resource'}), 401
             abort(401)
         
-        if current_user.role not in ['Admin', 'HR Officer']:
+        if current_user.role not in HR_ROLES:
             if request.is_json or request.content_type == 'application/json':
                 return jsonify({'error': 'Forbidden', 'message': 'HR Officer or Admin access required'}), 403
             abort(403)
@@ -104,7 +107,7 @@ def payroll_required(f):
                 return jsonify({'error': 'Unauthorized', 'message': 'Please log in to access this resource'}), 401
             abort(401)
         
-        if current_user.role not in ['Admin', 'Payroll Officer']:
+        if current_user.role not in PAYROLL_ROLES:
             if request.is_json or request.content_type == 'application/json':
                 return jsonify({'error': 'Forbidden', 'message': 'Payroll Officer or Admin access required'}), 403
             abort(403)
@@ -6,6 +6,7 @@ import string
 from datetime import datetime
 from app import db
 from app.models import User
+from app.utils.cache import roster_cache
 
 
 def generate_login_id(first_name, last_name, date_of_joining):
@@ -67,7 +68,7 @@ def generate_login_id(first_name, last_name, date_of_joining):
     
     # Ensure uniqueness (in case of collision)
     counter = 0
-    while User.query.filter_by(employee_id=login_id).first():
+    while db.session.query(db.exists().where(User.employee_id == login_id)).scalar():
         counter += 1
         serial_number = existing_users + 1 + counter
         serial_str = f"{serial_number:04d}"
@@ -106,3 +107,22 @@ def generate_random_password(length=12):
     
     return ''.join(password)
 
+
+def get_employee_roster():
+    """
+    Get every Employee's id, name, login ID and email, ordered by name
+    
+    The rows are cached (shared across requests) until a user is created,
+    edited or deleted, so dropdowns and payroll lists don't re-query users
+    
+    Returns:
+        List of rows with id, name, employee_id and email attributes
+    """
+    roster = roster_cache.get('employees')
+    if roster is None:
+        roster = db.session.execute(
+            db.select(User.id, User.name, User.employee_id, User.email)
+            .where(User.role == 'Employee').order_by(User.name)
+        ).all()
+        roster_cache.set('employees', roster)
+    return roster
@@ -1,22 +1,26 @@
 import re
 from datetime import datetime, date
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_UPPERCASE_RE = re.compile(r'[A-Z]')
+_LOWERCASE_RE = re.compile(r'[a-z]')
+_DIGIT_RE = re.compile(r'[0-9]')
+
 def validate_email(email):
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def validate_phone(phone):
-    pattern = r'^[0-9]{10}$'
-    return re.match(pattern, phone) is not None
+    # Exactly 10 ASCII digits (str.isdigit alone also accepts e.g. superscripts)
+    return len(phone) == 10 and phone.isascii() and phone.isdigit()
 
 def validate_password(password):
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+    if not _UPPERCASE_RE.search(password):
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if not _LOWERCASE_RE.search(password):
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'[0-9]', password):
+    if not _DIGIT_RE.search(password):
         return False, "Password must contain at least one number"
     return True, "Password is valid"
 
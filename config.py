@@ -35,15 +35,30 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     # For serverless environments (Vercel), configure connection pooling
     # Note: Flask-SQLAlchemy 3.x uses SQLALCHEMY_ENGINE_OPTIONS
+    # The Neon "-pooler" host is PgBouncer in transaction mode, so each worker
+    # keeps a small LIFO pool: the most recently used connection is reused and
+    # surplus ones sit idle until pool_recycle drops them
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_use_lifo': True,
         'connect_args': {
             'connect_timeout': 10,
-            'sslmode': 'require'
+            'sslmode': 'require',
+            # Detect connections silently dropped by the pooler/NAT
+            'keepalives': 1,
+            'keepalives_idle': 30,
+            'keepalives_interval': 10,
+            'keepalives_count': 5
         }
     }
     
+    # Identifies the deployed build; part of the payslip page ETags, so a
+    # deploy invalidates the copies browsers already hold
+    RELEASE = os.environ.get('RELEASE') or os.environ.get('VERCEL_GIT_COMMIT_SHA') or ''
+    
     # Google OAuth configuration
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID') or '526764377709-eumd84rde6job3qrr73otr1outhpfbol.apps.googleusercontent.com'
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET') or ''
@@ -0,0 +1,34 @@
+"""pg_trgm extension and trigram indexes for the employee search
+
+Revision ID: 1f3a9c2e7b40
+Revises: 9c4e0b7d2a15
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f3a9c2e7b40'
+down_revision = '9c4e0b7d2a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Trigram indexes are Postgres-only (the models declare them with ddl_if)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_users_employee_id_trgm', 'users', ['employee_id'],
+                    postgresql_using='gin', postgresql_ops={'employee_id': 'gin_trgm_ops'})
+    op.create_index('ix_users_email_trgm', 'users', ['email'],
+                    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_users_email_trgm', table_name='users')
+    op.drop_index('ix_users_employee_id_trgm', table_name='users')
@@ -0,0 +1,28 @@
+"""trigram index on lower(name) for the word-by-word name search
+
+Revision ID: 3b7d5e1a9f62
+Revises: 1f3a9c2e7b40
+Create Date: 2026-10-15 10:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d5e1a9f62'
+down_revision = '1f3a9c2e7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE INDEX ix_users_name_lower_trgm ON users USING gin (lower(name) gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_users_name_lower_trgm', table_name='users')
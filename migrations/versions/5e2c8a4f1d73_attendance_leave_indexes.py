@@ -0,0 +1,28 @@
+"""covering attendance index and partial approved-leave index
+
+Revision ID: 5e2c8a4f1d73
+Revises: 3b7d5e1a9f62
+Create Date: 2026-10-15 10:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2c8a4f1d73'
+down_revision = '3b7d5e1a9f62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_attendance_date_user_status', 'attendances', ['date', 'user_id'],
+                    postgresql_include=['status'])
+    op.create_index('ix_leave_active', 'leaves', ['start_date', 'end_date'],
+                    postgresql_where=sa.text("status = 'Approved'"))
+
+
+def downgrade():
+    op.drop_index('ix_leave_active', table_name='leaves')
+    op.drop_index('ix_attendance_date_user_status', table_name='attendances')
@@ -0,0 +1,28 @@
+"""partial indexes on employees by role for the list and directory ordering
+
+Revision ID: 7a9f3c6e2b84
+Revises: 5e2c8a4f1d73
+Create Date: 2026-10-15 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a9f3c6e2b84'
+down_revision = '5e2c8a4f1d73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_role_created_desc', 'users', ['role', sa.text('created_at DESC')],
+                    postgresql_where=sa.text("role = 'Employee'"))
+    op.create_index('ix_users_role_name', 'users', ['role', 'name'],
+                    postgresql_where=sa.text("role = 'Employee'"))
+
+
+def downgrade():
+    op.drop_index('ix_users_role_name', table_name='users')
+    op.drop_index('ix_users_role_created_desc', table_name='users')
@@ -0,0 +1,25 @@
+"""composite leave index on (user_id, status, start_date, end_date)
+
+Revision ID: 8d4b1f7c3e95
+Revises: 7a9f3c6e2b84
+Create Date: 2026-10-15 10:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4b1f7c3e95'
+down_revision = '7a9f3c6e2b84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_leaves_user_id_status_dates', 'leaves',
+                    ['user_id', 'status', 'start_date', 'end_date'])
+
+
+def downgrade():
+    op.drop_index('ix_leaves_user_id_status_dates', table_name='leaves')
@@ -0,0 +1,27 @@
+"""replace the attendance_logs.attendance_id index with (attendance_id, id DESC)
+
+Revision ID: a2e6c9d4f1b7
+Revises: 8d4b1f7c3e95
+Create Date: 2026-10-15 10:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2e6c9d4f1b7'
+down_revision = '8d4b1f7c3e95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create the replacement first so lookups by attendance_id stay indexed
+    op.create_index('ix_attlog_att_id_desc', 'attendance_logs', ['attendance_id', sa.text('id DESC')])
+    op.drop_index('ix_attendance_logs_attendance_id', table_name='attendance_logs')
+
+
+def downgrade():
+    op.create_index('ix_attendance_logs_attendance_id', 'attendance_logs', ['attendance_id'])
+    op.drop_index('ix_attlog_att_id_desc', table_name='attendance_logs')
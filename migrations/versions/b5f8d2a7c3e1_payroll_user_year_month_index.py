@@ -0,0 +1,24 @@
+"""payslip index on (user_id, year, month)
+
+Revision ID: b5f8d2a7c3e1
+Revises: a2e6c9d4f1b7
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5f8d2a7c3e1'
+down_revision = 'a2e6c9d4f1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_payroll_user_year_month', 'payrolls', ['user_id', 'year', 'month'])
+
+
+def downgrade():
+    op.drop_index('ix_payroll_user_year_month', table_name='payrolls')
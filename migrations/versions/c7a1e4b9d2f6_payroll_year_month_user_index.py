@@ -0,0 +1,28 @@
+"""replace the payrolls.year index with (year, month, user_id) INCLUDE (gross_salary)
+
+Revision ID: c7a1e4b9d2f6
+Revises: b5f8d2a7c3e1
+Create Date: 2026-10-15 11:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a1e4b9d2f6'
+down_revision = 'b5f8d2a7c3e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create the replacement first so filtering by year stays indexed
+    op.create_index('ix_payroll_year_month_user', 'payrolls', ['year', 'month', 'user_id'],
+                    postgresql_include=['gross_salary'])
+    op.drop_index('ix_payrolls_year', table_name='payrolls')
+
+
+def downgrade():
+    op.create_index('ix_payrolls_year', 'payrolls', ['year'])
+    op.drop_index('ix_payroll_year_month_user', table_name='payrolls')
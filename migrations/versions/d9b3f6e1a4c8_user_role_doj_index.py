@@ -0,0 +1,25 @@
+"""partial index on employees by (role, date_of_joining) for the headcount chart
+
+Revision ID: d9b3f6e1a4c8
+Revises: c7a1e4b9d2f6
+Create Date: 2026-10-15 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9b3f6e1a4c8'
+down_revision = 'c7a1e4b9d2f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_role_doj', 'users', ['role', 'date_of_joining'],
+                    postgresql_where=sa.text("role = 'Employee'"))
+
+
+def downgrade():
+    op.drop_index('ix_users_role_doj', table_name='users')
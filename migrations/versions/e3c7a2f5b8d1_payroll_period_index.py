@@ -0,0 +1,24 @@
+"""payroll index on the (year * 12 + month) period used by the report filter
+
+Revision ID: e3c7a2f5b8d1
+Revises: d9b3f6e1a4c8
+Create Date: 2026-10-15 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3c7a2f5b8d1'
+down_revision = 'd9b3f6e1a4c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_payroll_period', 'payrolls', [sa.text('(year * 12 + month)'), 'user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_payroll_period', table_name='payrolls')